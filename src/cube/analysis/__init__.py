@@ -0,0 +1,3 @@
+'''
+Vectorised numerical helpers used by the normalizers.
+'''
@@ -0,0 +1,125 @@
+'''
+Least-squares fit of magnetocrystalline anisotropy constants to the total energies
+of ground state calculations with the magnetisation along different directions.
+
+The energy per cell is modelled as
+
+    E(theta, phi) = E0 + K1 sin^2(theta) + K2 sin^4(theta)
+                    + K3 sin^4(theta) cos(4 phi) + K1_in_plane sin^2(theta) cos(2 phi)
+
+with the polar angle theta from the c-axis (z) and the azimuth phi from x. Only the
+terms that the available directions can distinguish are fitted, in the order
+above, so x/y/z calculations give E0, K1 and K1_in_plane.
+'''
+
+import re
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+TERMS = ('E0', 'K1', 'K2', 'K3', 'K1_in_plane')
+
+_AXES = {
+    'x': (1.0, 0.0, 0.0),
+    'y': (0.0, 1.0, 0.0),
+    'z': (0.0, 0.0, 1.0),
+}
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)'
+_VECTOR_RE = re.compile(rf'({_NUMBER})_({_NUMBER})_({_NUMBER})')
+_ANGLES_RE = re.compile(rf'theta({_NUMBER})_phi({_NUMBER})')
+
+
+class AnisotropyFit(NamedTuple):
+    '''
+    Result of `fit_anisotropy`.
+
+    Attributes:
+        terms: The names of the fitted terms, a subset of `TERMS`.
+        coefficients: The fitted coefficients (terms x sets) in the unit of the
+            energies, or (terms,) for a single set.
+        residuals: The energies minus the model (directions x sets), or
+            (directions,) for a single set.
+    '''
+
+    terms: tuple
+    coefficients: np.ndarray
+    residuals: np.ndarray
+
+
+def parse_direction(name: str) -> Optional[np.ndarray]:
+    '''
+    Returns the unit vector of the magnetisation direction named by a ground state
+    subdirectory, or None if `name` does not name a direction. Accepted are the
+    axes `x`, `y` and `z`, Cartesian vectors `h_k_l` (e.g. `1_1_0`) and polar and
+    azimuthal angles in degrees `theta<deg>_phi<deg>` (e.g. `theta45_phi0`).
+    '''
+    if name in _AXES:
+        return np.array(_AXES[name])
+    if match := _VECTOR_RE.fullmatch(name):
+        vector = np.array([float(v) for v in match.groups()])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+    if match := _ANGLES_RE.fullmatch(name):
+        theta, phi = np.radians([float(v) for v in match.groups()])
+        return np.array([np.sin(theta) * np.cos(phi),
+                         np.sin(theta) * np.sin(phi),
+                         np.cos(theta)])
+    return None
+
+
+def design_matrix(directions: np.ndarray) -> np.ndarray:
+    '''
+    Returns the values of all `TERMS` (directions x terms) for an array of
+    direction vectors (directions x 3).
+    '''
+    directions = np.asarray(directions, dtype=np.float64)
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    sin2 = 1.0 - directions[:, 2] ** 2
+    phi = np.arctan2(directions[:, 1], directions[:, 0])
+    return np.stack([
+        np.ones_like(sin2),
+        sin2,
+        sin2 ** 2,
+        sin2 ** 2 * np.cos(4 * phi),
+        sin2 * np.cos(2 * phi),
+    ], axis=1)
+
+
+def independent_terms(matrix: np.ndarray, tol: float = 1e-10) -> list:
+    '''
+    Returns the indices of the columns of `matrix` that are linearly independent
+    of the preceding selected columns.
+    '''
+    selected = []
+    for column in range(matrix.shape[1]):
+        candidate = selected + [column]
+        if np.linalg.matrix_rank(matrix[:, candidate], tol=tol) == len(candidate):
+            selected = candidate
+    return selected
+
+
+def fit_anisotropy(directions: np.ndarray, energies: np.ndarray) -> AnisotropyFit:
+    '''
+    Fits the anisotropy model to the `energies` of the magnetisation `directions`
+    (directions x 3) by linear least squares.
+
+    `energies` is either one value per direction or an array (directions x sets),
+    in which case all sets, e.g. several calculations with the same angle set, are
+    fitted at once.
+    '''
+    energies = np.asarray(energies, dtype=np.float64)
+    matrix = design_matrix(directions)
+    if matrix.shape[0] != energies.shape[0]:
+        raise ValueError(f'got {matrix.shape[0]} directions and '
+                         f'{energies.shape[0]} energies')
+    selected = independent_terms(matrix)
+    if len(selected) < 2:  # noqa: PLR2004
+        raise ValueError('the directions do not determine any anisotropy constant')
+
+    matrix = matrix[:, selected]
+    coefficients = np.linalg.lstsq(matrix, energies, rcond=None)[0]
+    return AnisotropyFit(
+        terms=tuple(TERMS[i] for i in selected),
+        coefficients=coefficients,
+        residuals=energies - matrix @ coefficients,
+    )
@@ -0,0 +1,70 @@
+'''
+Helpers for optimisation campaigns with one hysteresis loop per iteration.
+
+The loops of all iterations are stacked into (iteration x step) arrays that are
+padded to the longest loop, and the objective of every iteration is tracked
+together with the best value found so far.
+'''
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from cube.analysis.hysteresis import analyse_loop, loop_area, zero_crossings
+
+
+def _mean_abs(values: np.ndarray) -> float:
+    return float(np.mean(np.abs(values))) if len(values) else np.nan
+
+
+# objective name -> function of the field and the magnetisation of one loop
+OBJECTIVES: dict[str, Callable[[np.ndarray, np.ndarray], float]] = {
+    'coercive_field': lambda H, M: _mean_abs(zero_crossings(H, M)),
+    'remanent_magnetisation': lambda H, M: _mean_abs(zero_crossings(M, H)),
+    'saturation_magnetisation': lambda H, M: float(np.max(np.abs(M))),
+    'loop_area': loop_area,
+    'switching_field': lambda H, M: _mean_abs(analyse_loop(H, M).switching_fields),
+}
+
+
+def loop_objective(H: np.ndarray, M: np.ndarray, objective: str) -> float:
+    '''
+    Returns the value of the named `objective` for one loop, NaN if the loop is too
+    short or the objective is not defined for it.
+    '''
+    if objective not in OBJECTIVES:
+        raise ValueError(f'unknown objective {objective!r}, expected one of '
+                         f'{", ".join(OBJECTIVES)}')
+    if len(H) < 2:  # noqa: PLR2004
+        return np.nan
+    return OBJECTIVES[objective](np.asarray(H, dtype=np.float64),
+                                 np.asarray(M, dtype=np.float64))
+
+
+def stack_rows(
+    previous: Optional[np.ndarray], rows: list, fill, dtype
+) -> np.ndarray:
+    '''
+    Appends the 1-d arrays `rows` to the 2-d array `previous` (or to an empty array
+    if None). Rows and `previous` are padded with `fill` to the longest row.
+    '''
+    if previous is None:
+        previous = np.empty((0, 0), dtype=dtype)
+    width = max([previous.shape[1]] + [len(row) for row in rows])
+    stacked = np.full((len(previous) + len(rows), width), fill, dtype=dtype)
+    stacked[:len(previous), :previous.shape[1]] = previous
+    for i, row in enumerate(rows, start=len(previous)):
+        stacked[i, :len(row)] = row
+    return stacked
+
+
+def best_so_far(
+    values: np.ndarray, previous_best: float = np.nan, maximize: bool = True
+) -> np.ndarray:
+    '''
+    Returns the best of `values` up to every iteration, continuing from the best
+    value `previous_best` of earlier iterations. NaN values are ignored.
+    '''
+    accumulate = np.fmax.accumulate if maximize else np.fmin.accumulate
+    values = np.concatenate([[previous_best], np.asarray(values, dtype=np.float64)])
+    return accumulate(values)[1:]
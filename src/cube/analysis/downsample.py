@@ -0,0 +1,65 @@
+'''
+Shape-preserving downsampling of hysteresis loops for plotting.
+
+The loop is split into equally sized buckets along the sweep. For every bucket the
+points with the minimal and maximal field and magnetisation are kept, so steep
+switching events survive. Points next to a sign change of the field (remanence) or
+of the magnetisation (coercive field) are kept as well, together with the first
+and the last point.
+'''
+
+import numpy as np
+
+POINTS_PER_BUCKET = 4
+
+
+def _bucket_extrema(values: np.ndarray, bucket: int) -> np.ndarray:
+    n = len(values)
+    n_buckets = -(-n // bucket)
+    padded = np.pad(values, (0, n_buckets * bucket - n), mode='edge')
+    padded = padded.reshape(n_buckets, bucket)
+    offsets = np.arange(n_buckets) * bucket
+    indices = np.concatenate(
+        [padded.argmin(axis=1) + offsets, padded.argmax(axis=1) + offsets]
+    )
+    return np.minimum(indices, n - 1)
+
+
+def _sign_changes(values: np.ndarray) -> np.ndarray:
+    before = np.flatnonzero(np.diff(np.signbit(values)))
+    return np.concatenate([before, before + 1])
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    '''
+    Returns the sorted indices of at most `max_points` points of the curve (x, y)
+    that keep its shape. If `max_points` is not positive or the curve is small
+    enough, all indices are returned.
+    '''
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    if max_points < 2 + POINTS_PER_BUCKET + 1:
+        # too few points for a single bucket, keep evenly spaced points
+        return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
+
+    # a fifth of the budget is reserved for the points around sign changes
+    n_buckets = (max_points - 2) // (POINTS_PER_BUCKET + 1)
+    bucket = -(-n // n_buckets)
+    indices = [
+        np.array([0, n - 1]),
+        _bucket_extrema(x, bucket),
+        _bucket_extrema(y, bucket),
+    ]
+
+    crossings = np.unique(np.concatenate([_sign_changes(x), _sign_changes(y)]))
+    budget = max_points - 2 - POINTS_PER_BUCKET * (-(-n // bucket))
+    if len(crossings) > budget:
+        keep = np.linspace(0, len(crossings) - 1, max(budget, 0)).astype(np.int64)
+        crossings = crossings[keep]
+    indices.append(crossings)
+
+    return np.unique(np.concatenate(indices))
@@ -0,0 +1,69 @@
+'''
+Sparse exchange matrices and mean-field Curie temperatures from pairwise
+exchange couplings J_ij(R).
+
+The couplings of every pair of basis atoms are summed over all lattice vectors R
+into the lattice-summed exchange matrix J0, which is stored in CSR format. In the
+mean-field approximation, k_B T_c = 2/3 * lambda_max(J0) for the Heisenberg model
+H = -sum_{i != j} J_ij e_i . e_j with unit vectors e_i.
+'''
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# below this size the dense eigenvalue solver is faster and always applicable
+DENSE_LIMIT = 64
+
+
+def exchange_matrix(
+    i: np.ndarray, j: np.ndarray, J: np.ndarray, n_atoms: int = None
+) -> 'sparse.csr_matrix':
+    '''
+    Returns the lattice-summed exchange matrix J0 with
+    J0[a, b] = sum_R J_ab(R) for the 1-based atom numbers `i` and `j`. Raises a
+    ValueError if an atom number is not in 1..n_atoms.
+    '''
+    # scipy.sparse is slow to import and only needed for Monte Carlo inputs
+    from scipy import sparse  # noqa: PLC0415
+
+    i = np.asarray(i, dtype=np.int64) - 1
+    j = np.asarray(j, dtype=np.int64) - 1
+    if n_atoms is None:
+        n_atoms = int(max(i.max(initial=-1), j.max(initial=-1))) + 1
+    invalid = (i < 0) | (i >= n_atoms) | (j < 0) | (j >= n_atoms)
+    if invalid.any():
+        pair = int(np.flatnonzero(invalid)[0])
+        raise ValueError(
+            f'exchange pair {pair + 1} couples atoms {i[pair] + 1} and {j[pair] + 1}, '
+            f'expected atom numbers 1 to {n_atoms}'
+        )
+    # duplicate entries (different R) are summed by the conversion to CSR
+    return sparse.coo_matrix(
+        (np.asarray(J, dtype=np.float64), (i, j)), shape=(n_atoms, n_atoms)
+    ).tocsr()
+
+
+def largest_eigenvalue(matrix: 'sparse.spmatrix') -> float:
+    '''
+    Returns the largest eigenvalue of the symmetric part of a sparse matrix.
+    '''
+    from scipy.sparse.linalg import eigsh  # noqa: PLC0415
+
+    symmetric = 0.5 * (matrix + matrix.T)
+    if symmetric.shape[0] == 0:
+        raise ValueError('the exchange matrix is empty')
+    if symmetric.shape[0] <= DENSE_LIMIT:
+        return float(np.linalg.eigvalsh(symmetric.toarray())[-1])
+    return float(eigsh(symmetric.astype(np.float64), k=1, which='LA',
+                       return_eigenvectors=False)[0])
+
+
+def mean_field_curie_energy(J0: 'sparse.spmatrix') -> float:
+    '''
+    Returns k_B T_c in the energy unit of the couplings in `J0`.
+    '''
+    return 2.0 / 3.0 * largest_eigenvalue(J0)
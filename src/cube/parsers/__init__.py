@@ -1,13 +1,34 @@
+from typing import Optional
+
 from nomad.config.models.plugins import ParserEntryPoint
 from pydantic import Field
 
+# the names of the result files of B4Vex runs, which are part of the entry of
+# their configuration file and not parsed as Cube entries
+B4VEX_RESULT_FILE_RE = r'(?:iteration|result)(?:_\d+)?\.dat$'
+
 
 class NewParserEntryPoint(ParserEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
+    read_on_parse: bool = Field(
+        True,
+        description='Read the data file while parsing, so normalization does not '
+        'have to read it again.',
+    )
+    batch_workers: int = Field(
+        0,
+        description='Number of worker processes used by the batch ingestion in '
+        '`cube.parsers.batch`, 0 uses one per CPU.',
+    )
+    exclude_name_re: Optional[str] = Field(
+        B4VEX_RESULT_FILE_RE,
+        description='Regular expression for the names of data files that are not '
+        'parsed, by default the result files of B4Vex runs.',
+    )
 
     def load(self):
         # from cube.parsers.cubeparser import CubeParser
-        from cube.parsers.cubeparser import CubeParser
+        from cube.parsers.cubeparser import CubeParser  # noqa: PLC0415
 
         return CubeParser(**self.dict())
 
@@ -15,13 +36,13 @@ class NewParserEntryPoint(ParserEntryPoint):
 parser_entry_point = NewParserEntryPoint(
     name='NewParser',
     description='New parser entry point configuration.',
-    mainfile_name_re='.*dat',
+    mainfile_name_re=r'.*\.dat$',
 )
 
 
 class UUParserEntryPoint(ParserEntryPoint):
   def load(self):
-    from cube.parsers.uuparser import UUParser
+    from cube.parsers.uuparser import UUParser  # noqa: PLC0415
 
     return UUParser(**self.dict())
 
@@ -31,3 +52,29 @@ uuparser_entry_point = UUParserEntryPoint(
   description='New parser entry point configuration.',
   mainfile_name_re='.*cif',
 )
+
+
+class B4VexParserEntryPoint(ParserEntryPoint):
+  read_on_parse: bool = Field(
+    True,
+    description='Read the configuration and a single result file while parsing, '
+    'so normalization does not have to read them again.',
+  )
+  result_file_re: str = Field(
+    B4VEX_RESULT_FILE_RE,
+    description='Regular expression for the names of the result files next to '
+    'the configuration file.',
+  )
+
+  def load(self):
+    from cube.parsers.b4vexparser import B4VexParser  # noqa: PLC0415
+
+    return B4VexParser(**self.dict())
+
+
+b4vexparser_entry_point = B4VexParserEntryPoint(
+  name='B4VexParser',
+  description='Parser for B4Vex simulation runs, matched by their configuration '
+  'file.',
+  mainfile_name_re=r'.*\.ya?ml$',
+)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import re
+
+from nomad.datamodel import EntryArchive
+from nomad.parsing import MatchingParser
+
+from cube.parsers import B4VEX_RESULT_FILE_RE
+from cube.parsers.dirindex import directory_index, upload_path
+from cube.readers.sidecar import file_stat, read_and_cache_cube_dat
+from cube.schema_packages import get_entry_point_setting
+from cube.schema_packages.cube import RawFileFingerprint
+from cube.schema_packages.tmrshape import (
+  CONFIG_BLOCKS,
+  ENTRY_POINT_ID,
+  B4VexCampaign,
+  B4VexSimulation,
+  config_from_text,
+)
+
+_TOP_LEVEL_KEY_RE = re.compile(r'^([A-Za-z_]\w*)[ \t]*:', re.MULTILINE)
+_TRAILING_NUMBER_RE = re.compile(r'(\d+)(?=\D*$)')
+
+
+def is_b4vex_config(decoded_buffer: str) -> bool:
+  '''
+  Returns whether the beginning of a YAML file has all top-level blocks of a B4Vex
+  configuration.
+  '''
+  return set(CONFIG_BLOCKS) <= set(_TOP_LEVEL_KEY_RE.findall(decoded_buffer))
+
+
+def iteration_order(name: str):
+  '''
+  Sort key that orders result files by the last number in their name, so
+  `run_10.dat` follows `run_9.dat`.
+  '''
+  match = _TRAILING_NUMBER_RE.search(name)
+  return (int(match[1]) if match else -1, name)
+
+
+class B4VexParser(MatchingParser):
+  '''
+  Parses a B4Vex run from its configuration YAML file. The result files of the
+  run are the files next to the configuration that match `result_file_re`. A
+  single result file gives a `B4VexSimulation`, several give a `B4VexCampaign`
+  with one iteration per file.
+  '''
+  def __init__(self, read_on_parse: bool = True,
+               result_file_re: str = B4VEX_RESULT_FILE_RE, **kwargs):
+    super().__init__(**kwargs)
+    self.read_on_parse = read_on_parse
+    self.result_file_re = re.compile(result_file_re)
+
+  def is_mainfile(
+    self,
+    filename: str,
+    mime: str,
+    buffer: bytes,
+    decoded_buffer: str,
+    compression: str = None,
+  ):
+    if not super().is_mainfile(filename, mime, buffer, decoded_buffer, compression):
+      return False
+    # only the buffer passed in by NOMAD is checked, the file is not opened
+    if decoded_buffer is None:
+      decoded_buffer = buffer.decode('utf-8', errors='ignore')
+    return is_b4vex_config(decoded_buffer)
+
+  def result_files(self, mainfile: str) -> list[str]:
+    '''
+    Returns the names of the result files next to `mainfile` in iteration order.
+    '''
+    directory = os.path.dirname(mainfile)
+    index = directory_index(mainfile)
+    return sorted(
+      (name for name in index.listdir(directory)
+       if self.result_file_re.match(name)
+       and index.isfile(os.path.join(directory, name))),
+      key=iteration_order)
+
+  def parse(
+    self,
+    mainfile: str,
+    archive: EntryArchive,
+    logger=None,
+    child_archives: dict[str, EntryArchive] = None,
+  ) -> None:
+    logger.info('B4VexParser called')
+    config_file = upload_path(mainfile)
+    directory = os.path.dirname(config_file)
+    results = self.result_files(mainfile)
+
+    if len(results) > 1:
+      entry = B4VexCampaign(result_files=[
+        os.path.join(directory, name) for name in results])
+    else:
+      entry = B4VexSimulation()
+      if results:
+        entry.result_file = os.path.join(directory, results[0])
+    entry.config_file = config_file
+
+    if self.read_on_parse:
+      # the config and a single result are read here; normalization finds the
+      # matching fingerprints and does not read them again
+      with open(mainfile, 'rb') as file:
+        _, mtime = file_stat(file)
+        content = file.read()
+      entry.input_fingerprints.append(RawFileFingerprint(
+        path=config_file, size=len(content), mtime=mtime,
+        sha256=hashlib.sha256(content).hexdigest()))
+      entry.configuration = config_from_text(content.decode('utf-8'), logger)
+      if isinstance(entry, B4VexSimulation) and entry.result_file:
+        cache_dir = get_entry_point_setting(ENTRY_POINT_ID, 'sidecar_cache_dir',
+                                            None)
+        result_path = os.path.join(os.path.dirname(mainfile), results[0])
+        with open(result_path, 'rb') as file:
+          _, mtime = file_stat(file)
+          data, digest, size = read_and_cache_cube_dat(file, cache_dir)
+        entry.time, entry.H_ex, entry.M = data
+        entry.input_fingerprints.append(RawFileFingerprint(
+          path=entry.result_file, size=size, mtime=mtime, sha256=digest))
+        entry.createRowView()
+
+    archive.data = entry
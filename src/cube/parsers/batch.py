@@ -0,0 +1,138 @@
+'''
+Batch ingestion of many `cube.dat` files, e.g. from a parameter sweep.
+
+All candidate files below a directory are found in one `os.scandir` walk and
+matched with `CubeParser.is_mainfile` on their first bytes. The matching files are
+then parsed and normalized in a process pool. Every worker writes the archives of
+its files itself, only their paths are sent back to the parent process.
+'''
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from nomad.client import normalize_all
+from nomad.config import config
+from nomad.datamodel import ClientContext, EntryArchive, EntryMetadata
+
+from cube.parsers.cubeparser import CubeParser
+
+ENTRY_POINT_ID = 'cube.parsers:parser_entry_point'
+HEADER_SIZE = 1024
+MAINFILE_NAME_RE = r'.*\.dat$'
+
+
+def _parser_settings() -> dict:
+    try:
+        entry_point = config.get_plugin_entry_point(ENTRY_POINT_ID)
+    except Exception:
+        return dict(mainfile_name_re=MAINFILE_NAME_RE)
+    return entry_point.dict()
+
+
+def find_cube_files(
+    root: str,
+    parser: Optional[CubeParser] = None,
+    mainfile_name_re: Optional[str] = None,
+) -> list[str]:
+    '''
+    Returns the sorted paths of all files below `root` that the parser accepts as
+    mainfile. Candidates are the files whose name matches `mainfile_name_re`, by
+    default the pattern of the parser entry point. Only the first `HEADER_SIZE`
+    bytes of every candidate are read.
+    '''
+    settings = _parser_settings()
+    if parser is None:
+        parser = CubeParser(**settings)
+    if mainfile_name_re is None:
+        mainfile_name_re = settings.get('mainfile_name_re') or MAINFILE_NAME_RE
+    name_re = re.compile(mainfile_name_re)
+
+    paths = []
+    directories = [root]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file() and name_re.fullmatch(entry.name):
+                    with open(entry.path, 'rb') as file:
+                        buffer = file.read(HEADER_SIZE)
+                    decoded_buffer = buffer.decode('utf-8', errors='ignore')
+                    if parser.is_mainfile(entry.path, 'text/plain', buffer,
+                                          decoded_buffer):
+                        paths.append(entry.path)
+    return sorted(paths)
+
+
+def archive_path(output_dir: str, root: str, path: str) -> str:
+    '''
+    Returns the path of the `.archive.json` file of the mainfile `path` below
+    `output_dir`.
+    '''
+    return os.path.join(output_dir, os.path.relpath(path, root) + '.archive.json')
+
+
+def _ingest(args: tuple[str, str, str, dict]) -> tuple[str, Optional[str]]:
+    path, root, output_dir, settings = args
+    try:
+        parser = CubeParser(**settings)
+        data_file = os.path.relpath(path, root)
+        archive = EntryArchive(m_context=ClientContext(local_dir=root))
+        archive.metadata = EntryMetadata(mainfile=data_file)
+        archive.data = parser.create_entry(path, data_file)
+        normalize_all(archive)
+        target = archive_path(output_dir, root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w') as file:
+            json.dump(archive.m_to_dict(), file)
+        return path, None
+    except Exception as e:
+        return path, f'{type(e).__name__}: {e}'
+
+
+def parse_batch(
+    root: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    logger=None,
+) -> dict[str, str]:
+    '''
+    Parses and normalizes all `cube.dat` files below `root` in a process pool.
+
+    Args:
+        root: The directory that is searched. Data files are referenced relative
+            to it.
+        output_dir: The archive of every file is written as
+            `<relative path>.archive.json` below this directory.
+        workers: Number of worker processes. Defaults to the `batch_workers`
+            setting of the parser entry point, or one per CPU.
+        logger: Logger for files that could not be ingested.
+
+    Returns:
+        The paths of the written archives, keyed by the path of their mainfile.
+    '''
+    if logger is None:
+        logger = logging.getLogger(__name__)
+    settings = _parser_settings()
+    if workers is None:
+        workers = settings.get('batch_workers', 0)
+    workers = workers or os.cpu_count() or 1
+
+    paths = find_cube_files(root, CubeParser(**settings))
+    if not paths:
+        return {}
+    tasks = [(path, root, output_dir, settings) for path in paths]
+    chunksize = max(1, len(tasks) // (4 * workers))
+
+    archives = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, error in executor.map(_ingest, tasks, chunksize=chunksize):
+            if error is not None:
+                logger.error(f'could not ingest {path}: {error}')
+                continue
+            archives[path] = archive_path(output_dir, root, path)
+    return archives
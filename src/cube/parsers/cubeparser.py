@@ -1,12 +1,36 @@
 import os
+import re
+from typing import Optional
 
 from nomad.datamodel import EntryArchive
 from nomad.parsing import MatchingParser
 
-from cube.schema_packages.cube import Cube
+from cube.parsers import B4VEX_RESULT_FILE_RE
+from cube.parsers.dirindex import upload_path
+from cube.readers.sidecar import file_stat, read_and_cache_cube_dat
+from cube.schema_packages import get_entry_point_setting
+from cube.schema_packages.cube import ENTRY_POINT_ID, Cube, RawFileFingerprint
+
+# number of complete data lines that have to be present in the buffer
+MIN_DATA_LINES = 3
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_DATA_LINE = rf'[ \t]*[-+]?\d+[ \t]+{_NUMBER}[ \t]+{_NUMBER}[ \t]*\r?\n'
+# an optional header line followed by lines of an integer flag and two numbers
+CUBE_DAT_RE = re.compile(rf'(?:[^\n]*\n)?(?:{_DATA_LINE}){{{MIN_DATA_LINES}}}')
 
 
 class CubeParser(MatchingParser):
+    def __init__(
+        self,
+        read_on_parse: bool = True,
+        exclude_name_re: Optional[str] = B4VEX_RESULT_FILE_RE,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.read_on_parse = read_on_parse
+        self.exclude_name_re = re.compile(exclude_name_re) if exclude_name_re else None
+
     def is_mainfile(
         self,
         filename: str,
@@ -19,9 +43,14 @@ class CubeParser(MatchingParser):
                                                  compression)
         if not is_mainfile_super:
             return False
-        file = os.path.basename(filename)
-        #TODO: here could be more checks whether it is actually a correct cube.dat
-        return file == "cube.dat"
+        # the result files of a B4Vex run are part of the entry of its config
+        if self.exclude_name_re and self.exclude_name_re.match(
+                os.path.basename(filename)):
+            return False
+        # only the buffer passed in by NOMAD is checked, the file is not opened
+        if decoded_buffer is None:
+            decoded_buffer = buffer.decode('utf-8', errors='ignore')
+        return CUBE_DAT_RE.match(decoded_buffer) is not None
 
     def parse(
         self,
@@ -30,10 +59,25 @@ class CubeParser(MatchingParser):
         logger=None,
         child_archives: dict[str, EntryArchive] = None,
     ) -> None:
-        file = os.path.basename(mainfile)
-        # print("Hello", file, mainfile, archive, child_archives)
         logger.info('CubeParser called')
+        archive.data = self.create_entry(mainfile, upload_path(mainfile))
 
-        entry = Cube(data_file=file)
-
-        archive.data = entry
\ No newline at end of file
+    def create_entry(self, mainfile: str, data_file: str) -> Cube:
+        '''
+        Creates the `Cube` entry for the file at the OS path `mainfile`, which is
+        referenced as `data_file` relative to the raw files of the entry.
+        '''
+        entry = Cube(data_file=data_file)
+        if self.read_on_parse:
+            # the data is read once here, normalization finds the matching
+            # fingerprint and only computes derived data and figures
+            cache_dir = get_entry_point_setting(ENTRY_POINT_ID, 'sidecar_cache_dir',
+                                                None)
+            with open(mainfile, 'rb') as f:
+                _, mtime = file_stat(f)
+                data, digest, size = read_and_cache_cube_dat(f, cache_dir)
+            entry.time, entry.H_ex, entry.M = data
+            entry.input_fingerprints.append(RawFileFingerprint(
+                path=data_file, size=size, mtime=mtime, sha256=digest))
+            entry.createRowView()
+        return entry
\ No newline at end of file
@@ -0,0 +1,202 @@
+'''
+In-memory index of the files and directories of an upload.
+
+The index is built with a single `os.scandir` walk and keeps the entries of every
+directory, so presence checks and listings are answered from memory. Indices are
+cached per upload root and used in passes: a pass starts when an index is
+requested more than `PASS_SECONDS` after the start of the previous one, e.g. when
+an upload is processed again. The first lookup of a directory in a pass compares
+its modification time with the one seen by the last scan and scans it again if it
+changed. Adding or removing entries changes the modification time of their
+directory, so every pass sees the current upload at the cost of at most one
+`os.stat` per queried directory.
+'''
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_CACHED_INDICES = 4
+# directories are checked for changes at most once per pass of this duration
+PASS_SECONDS = 10.0
+
+
+class DirectoryIndex:
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        # the names of the entries of every directory, mapped to whether they are
+        # directories themselves
+        self.children: dict[str, dict[str, bool]] = {}
+        self.mtimes: dict[str, int] = {}
+        # the directories that were checked for changes in the current pass
+        self._checked: set[str] = set()
+        self._lock = threading.RLock()
+        self.pass_start = time.monotonic()
+        self._scan('')
+
+    def start_pass(self) -> None:
+        '''
+        Starts a new pass, directories are checked for changes again on their next
+        lookup.
+        '''
+        with self._lock:
+            self._checked.clear()
+            self.pass_start = time.monotonic()
+
+    def _scan(self, relative: str) -> None:
+        '''
+        Scans the directory `relative` and all its subdirectories that are not yet
+        indexed, and drops the subdirectories that no longer exist.
+        '''
+        directories = [relative]
+        while directories:
+            relative = directories.pop()
+            path = os.path.join(self.root, relative)
+            children = {}
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        children[entry.name] = True
+                        child = f'{relative}/{entry.name}' if relative else entry.name
+                        if not entry.is_symlink() and child not in self.children:
+                            directories.append(child)
+                    elif entry.is_file():
+                        children[entry.name] = False
+            for name, is_dir in self.children.get(relative, {}).items():
+                if is_dir and not children.get(name):
+                    self._drop(f'{relative}/{name}' if relative else name)
+            self.children[relative] = children
+            self.mtimes[relative] = mtime
+            self._checked.add(relative)
+
+    def _drop(self, relative: str) -> None:
+        for name, is_dir in self.children.pop(relative, {}).items():
+            if is_dir:
+                self._drop(f'{relative}/{name}')
+        self.mtimes.pop(relative, None)
+        self._checked.discard(relative)
+
+    def _refresh(self, relative: str) -> bool:
+        '''
+        Scans the directory `relative` again if it changed since it was last checked
+        and was not yet checked in this pass. Returns whether it exists.
+        '''
+        if relative in self._checked:
+            return True
+        if relative not in self.children:
+            # a new directory can only appear if its parent changed
+            if not relative or not self._refresh(relative.rpartition('/')[0]):
+                return False
+            if relative not in self.children:
+                return False
+        try:
+            mtime = os.stat(os.path.join(self.root, relative)).st_mtime_ns
+            if mtime != self.mtimes[relative]:
+                self._scan(relative)
+            self._checked.add(relative)
+        except FileNotFoundError:
+            self._drop(relative)
+            return False
+        return True
+
+    def _relative(self, path: str) -> str:
+        relative = os.path.relpath(os.path.normpath(path), self.root)
+        return '' if relative == '.' else relative.replace(os.sep, '/')
+
+    def _lookup(self, path: str):
+        '''
+        Returns whether the entry `path` is a directory, or None if it does not
+        exist.
+        '''
+        directory, _, name = self._relative(path).rpartition('/')
+        if not name:
+            return True
+        with self._lock:
+            if not self._refresh(directory):
+                return None
+            return self.children[directory].get(name)
+
+    def isfile(self, path: str) -> bool:
+        return self._lookup(path) is False
+
+    def isdir(self, path: str) -> bool:
+        return self._lookup(path) is True
+
+    def listdir(self, path: str) -> list[str]:
+        relative = self._relative(path)
+        with self._lock:
+            if not self._refresh(relative):
+                return []
+            return sorted(self.children[relative])
+
+
+_indices: OrderedDict[str, DirectoryIndex] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _raw_dir_end(path: str) -> int:
+    '''
+    Returns the index after the `/raw/` directory of the upload that contains
+    `path`, or -1 if it is not located in an upload.
+    '''
+    idx = path.rfind('/raw/')
+    return -1 if idx == -1 else idx + len('/raw/')
+
+
+def upload_root(path: str) -> str:
+    '''
+    Returns the raw directory of the upload that contains `path`, or the directory
+    of `path` if it is not located in an upload.
+    '''
+    end = _raw_dir_end(path)
+    if end == -1:
+        return os.path.dirname(path)
+    return path[: end - 1]
+
+
+def upload_path(mainfile: str) -> str:
+    '''
+    Returns the path of the mainfile relative to the raw directory of its upload,
+    or its basename if it is not located in an upload.
+    '''
+    end = _raw_dir_end(mainfile)
+    if end == -1:
+        return os.path.basename(mainfile)
+    return mainfile[end:]
+
+
+def directory_index(path: str) -> DirectoryIndex:
+    '''
+    Returns the cached index of the upload that contains the file `path`, and
+    starts a new pass of it if the current one is older than `PASS_SECONDS`.
+    '''
+    root = os.path.normpath(upload_root(path))
+    with _lock:
+        index = _indices.get(root)
+        if index is not None:
+            _indices.move_to_end(root)
+    if index is not None:
+        if time.monotonic() - index.pass_start > PASS_SECONDS:
+            index.start_pass()
+        return index
+
+    index = DirectoryIndex(root)
+    with _lock:
+        _indices[root] = index
+        _indices.move_to_end(root)
+        while len(_indices) > MAX_CACHED_INDICES:
+            _indices.popitem(last=False)
+    return index
+
+
+def invalidate(path: str = None) -> None:
+    '''
+    Drops the cached index of the upload that contains `path`, or all indices.
+    '''
+    with _lock:
+        if path is None:
+            _indices.clear()
+        else:
+            _indices.pop(os.path.normpath(upload_root(path)), None)
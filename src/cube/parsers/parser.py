@@ -10,13 +10,18 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
-from nomad.config import config
+import functools
+
 from nomad.datamodel.metainfo.workflow import Workflow
 from nomad.parsing.parser import MatchingParser
 
-configuration = config.get_plugin_entry_point(
-    'cube.parsers:parser_entry_point'
-)
+
+@functools.cache
+def get_configuration():
+    # the plugin config is only looked up on first use, not at import time
+    from nomad.config import config  # noqa: PLC0415
+
+    return config.get_plugin_entry_point('cube.parsers:parser_entry_point')
 
 
 class NewParser(MatchingParser):
@@ -27,6 +32,6 @@ class NewParser(MatchingParser):
         logger: 'BoundLogger',
         child_archives: dict[str, 'EntryArchive'] = None,
     ) -> None:
-        logger.info('NewParser.parse', parameter=configuration.parameter)
+        logger.info('NewParser.parse', parameter=get_configuration().parameter)
 
         archive.workflow2 = Workflow(name='test')
@@ -1,9 +1,28 @@
 import os
+from typing import NamedTuple
 
 from nomad.datamodel import EntryArchive
 from nomad.parsing import MatchingParser
 
-from cube.schema_packages.uu_schema import GroundState, UUData
+from cube.analysis.anisotropy import parse_direction
+from cube.parsers.dirindex import DirectoryIndex, directory_index
+from cube.schema_packages.mammos_ontology import CrystalStructure
+from cube.schema_packages.uu_schema import GroundState, MonteCarloInput, UUData
+
+
+class UUFilesPresent(NamedTuple):
+  """
+  Result of `UUParser.checkFilesPresent` for one directory.
+  """
+  directory: str
+  ok: bool
+  readme: bool
+  mandatory_subfolders: bool
+  optional_subfolders: list
+  structure_cif: bool
+  out_last_x: bool
+  out_last_z: bool
+  mom_j_pos_files: bool
 
 
 class UUParser(MatchingParser):
@@ -20,51 +39,76 @@ class UUParser(MatchingParser):
     if os.path.basename(filename) != "structure.cif":
       return False
 
-    self.dir = os.path.dirname(filename)
+    # the directory is passed explicitly, so one parser instance can be shared
+    # by concurrent matching threads
+    directory = os.path.dirname(filename)
+    # all presence checks are answered from one index of the whole upload
+    index = directory_index(filename)
 
-    return self.checkFilesPresent()
-  
-  def checkFilesPresent(self, 
+    return self.checkFilesPresent(directory, index).ok
+
+  def checkFilesPresent(self,  # noqa: PLR0913
+                        directory: str,
+                        index: DirectoryIndex,
+                        *,
                         check_subfolders=True,
                         check_optional_subf=True,
                         check_README=False,
                         check_structure_cif=True,
-                        check_out_last_files=True):
+                        check_out_last_files=True) -> 'UUFilesPresent':
+    """
+    Checks which of the files of a UU calculation are present in `directory`.
+    Files that are not checked count as present for the overall result `ok`.
+    """
     readme_exists = False
     mandatory_subfolders_exist = False
+    optional_subfolders_exist = []
     structure_cif_exists = False
     out_last_x_exists = False
     out_last_z_exists = False
+    mom_j_pos_file_exists = False
 
     if check_README:
-      readme_exists = os.path.isfile(os.path.join(self.dir, 'README'))
+      readme_exists = index.isfile(os.path.join(directory, 'README'))
     if check_subfolders:
-      mandatory_subfolders_exist, _ = self.check_subfolders_exist(check_optional_subf)
+      mandatory_subfolders_exist, optional_subfolders_exist = \
+        self.check_subfolders_exist(directory, index, check_optional_subf)
 
       if mandatory_subfolders_exist:
         if check_out_last_files:
-          out_last_x_exists = os.path.isfile(self.dir+'/GS/x/out_last')
-          out_last_z_exists = os.path.isfile(self.dir+'/GS/z/out_last')
+          out_last_x_exists = index.isfile(directory+'/GS/x/out_last')
+          out_last_z_exists = index.isfile(directory+'/GS/z/out_last')
 
-        posfile_exists = os.path.isfile(self.dir+'/MC/posfile')
-        jfile_exists = os.path.isfile(self.dir+'/MC/jfile')
-        momfile_exists = os.path.isfile(self.dir+'/MC/momfile')
+        posfile_exists = index.isfile(directory+'/MC/posfile')
+        jfile_exists = index.isfile(directory+'/MC/jfile')
+        momfile_exists = index.isfile(directory+'/MC/momfile')
 
-        if (posfile_exists or jfile_exists or momfile_exists):
-          mom_j_pos_file_exists = True
-        else:
-          mom_j_pos_file_exists = False
+        mom_j_pos_file_exists = posfile_exists or jfile_exists or momfile_exists
 
     if check_structure_cif:
-      structure_cif_exists = os.path.isfile(os.path.join(self.dir,'structure.cif'))
-
-    return_values = [readme_exists or not check_README, mandatory_subfolders_exist,
-                      structure_cif_exists, out_last_x_exists, out_last_z_exists,
-                      mom_j_pos_file_exists]
-
-    return all(return_values)
-
-  def check_subfolders_exist(self, check_optional_subf=True):
+      structure_cif_exists = index.isfile(os.path.join(directory,'structure.cif'))
+
+    return_values = [readme_exists or not check_README,
+                     mandatory_subfolders_exist or not check_subfolders,
+                     structure_cif_exists or not check_structure_cif,
+                     (out_last_x_exists and out_last_z_exists)
+                       or not (check_subfolders and check_out_last_files),
+                     mom_j_pos_file_exists or not check_subfolders]
+
+    return UUFilesPresent(
+      directory=directory,
+      ok=all(return_values),
+      readme=readme_exists,
+      mandatory_subfolders=mandatory_subfolders_exist,
+      optional_subfolders=optional_subfolders_exist,
+      structure_cif=structure_cif_exists,
+      out_last_x=out_last_x_exists,
+      out_last_z=out_last_z_exists,
+      mom_j_pos_files=mom_j_pos_file_exists,
+    )
+
+  def check_subfolders_exist(self, directory: str, index: DirectoryIndex,
+                             check_optional_subf=True):
     mandatory_subfolders = ['GS', 'GS/x', 'GS/z', 'Jij', 'MC']
     non_mandatory_subfolders = ['GS/y']
 
@@ -72,16 +116,16 @@ class UUParser(MatchingParser):
     non_mandatory_exist = []
 
     for subfolder in mandatory_subfolders:
-      subfolder_path = os.path.join(self.dir, subfolder)
-      if os.path.isdir(subfolder_path):
+      subfolder_path = os.path.join(directory, subfolder)
+      if index.isdir(subfolder_path):
         mandatory_exist.append(True)
       else:
         mandatory_exist.append(False)
 
     if check_optional_subf:
       for subfolder in non_mandatory_subfolders:
-        subfolder_path = os.path.join(self.dir, subfolder)
-        if os.path.isdir(subfolder_path):
+        subfolder_path = os.path.join(directory, subfolder)
+        if index.isdir(subfolder_path):
           non_mandatory_exist.append(True)
         else:
           non_mandatory_exist.append(False)
@@ -111,24 +155,48 @@ class UUParser(MatchingParser):
       archiveData_dir_GS = archiveBaseDir + "/GS/"
       data_dir_MC = baseDir + "/MC"
 
-      xyz_dirs = [dirdir for dirdir in os.listdir(data_dir_GS) if len(dirdir) == 1]
+      index = directory_index(mainfile)
+      # one subdirectory per magnetisation direction, see `parse_direction`
+      xyz_dirs = [dirdir for dirdir in index.listdir(data_dir_GS)
+                  if parse_direction(dirdir) is not None
+                  and index.isdir(data_dir_GS + dirdir)]
 
       print(f'data_dir_GS {data_dir_GS} data_dir_MC {data_dir_MC}'
              f' xyz_dirs {xyz_dirs} idx{idx}')
 
       # Reading file into lines; all folders are equivalent according to 
-      # UU-colleagues, so we can use the first one
-      file_Name_Ms = archiveBaseDir + "/GS/" + f"{xyz_dirs[0]}/out_last"
+      # UU-colleagues, so we can use the first one with an out_last file. x and z
+      # come first, their out_last files are the ones checked by `is_mainfile`
+      out_last_dir = next(
+        (dirdir for dirdir in ('x', 'z', *xyz_dirs)
+         if index.isfile(f'{data_dir_GS}{dirdir}/out_last')), 'x')
+      file_Name_Ms = archiveBaseDir + "/GS/" + f"{out_last_dir}/out_last"
       print(f'file_Name_Ms {file_Name_Ms}')
 
       fx = archiveData_dir_GS + "x/out_MF_x" if 'x' in xyz_dirs else None
       fy = archiveData_dir_GS + "y/out_MF_y" if 'y' in xyz_dirs else None
       fz = archiveData_dir_GS + "z/out_MF_z" if 'z' in xyz_dirs else None
-      fol = f"{archiveData_dir_GS}{xyz_dirs[0]}/out_last"
+      fol = f"{archiveData_dir_GS}{out_last_dir}/out_last"
 
       # entry = Cube(data_file=file)
       groundState = GroundState(out_MF_x=fx,out_MF_y=fy,out_MF_z=fz)
+      other_dirs = [dirdir for dirdir in xyz_dirs if dirdir not in ('x', 'y', 'z')
+                    and index.isfile(f'{data_dir_GS}{dirdir}/out_MF_{dirdir}')]
+      if other_dirs:
+        groundState.directions = other_dirs
+        groundState.out_MF_files = [
+          f'{archiveData_dir_GS}{dirdir}/out_MF_{dirdir}' for dirdir in other_dirs]
       # groundState.normalize(archive=archive,logger=logger)
       entry = UUData(groundState=groundState,out_last_file=fol)
 
+      mc_files = {
+        name: archiveBaseDir + f"/MC/{name}"
+        for name in ('posfile', 'momfile', 'jfile')
+        if index.isfile(f'{data_dir_MC}/{name}')
+      }
+      if mc_files:
+        entry.monteCarlo = MonteCarloInput(**mc_files)
+      entry.crystalStructure = CrystalStructure(
+        data_file=archiveBaseDir + '/' + os.path.basename(mainfile))
+
       archive.data = entry
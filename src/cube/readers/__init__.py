@@ -0,0 +1,5 @@
+'''
+Readers for the raw files handled by the plugin. The readers return plain NumPy
+arrays and do not depend on the metainfo, so they can be used from parsers,
+normalizers and scripts alike.
+'''
@@ -0,0 +1,112 @@
+'''
+Lightweight reader for the cell parameters and the space group of CIF files.
+
+Only the single-valued cell and symmetry tags are read with one compiled pattern,
+no crystallography package is needed. Parsed results are cached by the hash of
+the file content.
+'''
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import IO, NamedTuple, Optional
+
+import numpy as np
+
+MAX_CACHED_FILES = 1024
+
+_TAGS = {
+    '_cell_length_a': 'a',
+    '_cell_length_b': 'b',
+    '_cell_length_c': 'c',
+    '_cell_angle_alpha': 'alpha',
+    '_cell_angle_beta': 'beta',
+    '_cell_angle_gamma': 'gamma',
+    '_space_group_name_H-M_alt': 'space_group',
+    '_symmetry_space_group_name_H-M': 'space_group',
+}
+_TAGS_BY_LOWER = {tag.lower(): name for tag, name in _TAGS.items()}
+_TAG_RE = re.compile(
+    r'^[ \t]*(' + '|'.join(re.escape(tag) for tag in _TAGS) + r')[ \t]+([^\r\n]+)',
+    re.MULTILINE | re.IGNORECASE,
+)
+_UNCERTAINTY_RE = re.compile(r'\([0-9]+\)$')
+# CIF placeholders for unknown (?) and inapplicable (.) values
+_PLACEHOLDERS = ('?', '.')
+
+
+class CellParameters(NamedTuple):
+    a: float
+    b: float
+    c: float
+    alpha: float
+    beta: float
+    gamma: float
+    volume: float
+    space_group: Optional[str]
+
+
+def cell_volume(lengths, angles):
+    '''
+    Returns the volume of the cells with the lengths a, b, c and the angles alpha,
+    beta, gamma (in degrees) along the first axis of `lengths` and `angles`.
+    Further axes compute many volumes at once.
+    '''
+    cos = np.cos(np.radians(angles))
+    factor = 1 - np.sum(cos**2, axis=0) + 2 * np.prod(cos, axis=0)
+    return np.prod(lengths, axis=0) * np.sqrt(factor)
+
+
+def _number(name: str, value: str) -> float:
+    try:
+        return float(_UNCERTAINTY_RE.sub('', value))
+    except ValueError:
+        raise ValueError(f'CIF with invalid cell parameter {name} {value!r}') from None
+
+
+def parse_cif(text: str) -> CellParameters:
+    '''
+    Returns the cell parameters of the first data block that defines them. Raises
+    a `ValueError` if a cell parameter is missing, unknown or not a number.
+    '''
+    values = {}
+    for match in _TAG_RE.finditer(text):
+        name = _TAGS_BY_LOWER[match[1].lower()]
+        value = match[2].strip().strip('\'"').strip()
+        if value not in _PLACEHOLDERS:
+            values.setdefault(name, value)
+
+    missing = [n for n in ('a', 'b', 'c', 'alpha', 'beta', 'gamma') if n not in values]
+    if missing:
+        raise ValueError(f'CIF without cell parameters {", ".join(missing)}')
+    cell = [_number(n, values[n]) for n in ('a', 'b', 'c', 'alpha', 'beta', 'gamma')]
+    return CellParameters(
+        *cell,
+        volume=float(cell_volume(cell[:3], cell[3:])),
+        space_group=values.get('space_group'),
+    )
+
+
+_cache: OrderedDict[str, CellParameters] = OrderedDict()
+_lock = threading.Lock()
+
+
+def read_cif(file: IO) -> CellParameters:
+    '''
+    Reads the cell parameters from an open binary CIF file. Files with the same
+    content are parsed only once.
+    '''
+    content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        if digest in _cache:
+            _cache.move_to_end(digest)
+            return _cache[digest]
+
+    cell = parse_cif(content.decode('utf-8', errors='replace'))
+    with _lock:
+        _cache[digest] = cell
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+    return cell
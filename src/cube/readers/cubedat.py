@@ -0,0 +1,129 @@
+'''
+Streaming reader for `cube.dat` files.
+
+A `cube.dat` file holds three whitespace separated columns per line: an integer
+flag, the external field `H_ex` and the magnetisation `M`. The file is read in
+fixed-size chunks which are tokenized with `bytes.split` and converted with one
+NumPy call per chunk, so the peak memory is about the size of the output arrays.
+'''
+
+import os
+from typing import IO, NamedTuple, Optional
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 22
+N_COLUMNS = 3
+
+
+class CubeData(NamedTuple):
+    time: np.ndarray
+    H_ex: np.ndarray
+    M: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.H_ex)
+
+
+class _ColumnBuffer:
+    '''
+    Growing column storage. The capacity is estimated from the file size after the
+    first chunk and doubled if the estimate turns out to be too small.
+    '''
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.columns = [
+            np.empty(capacity, dtype=np.int64),
+            np.empty(capacity, dtype=np.float64),
+            np.empty(capacity, dtype=np.float64),
+        ]
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= len(self.columns[0]):
+            return
+        for column in self.columns:
+            column.resize(capacity, refcheck=False)
+
+    def append(self, values: np.ndarray) -> None:
+        n = len(values)
+        if self.size + n > len(self.columns[0]):
+            self.reserve(max(2 * len(self.columns[0]), self.size + n))
+        for i, column in enumerate(self.columns):
+            column[self.size : self.size + n] = values[:, i]
+        self.size += n
+
+    def finish(self) -> CubeData:
+        for column in self.columns:
+            column.resize(self.size, refcheck=False)
+        return CubeData(*self.columns)
+
+
+def _file_size(file: IO) -> Optional[int]:
+    try:
+        return os.fstat(file.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _parse_block(block, line_offset: int) -> np.ndarray:
+    tokens = block.split()
+    if len(tokens) % N_COLUMNS != 0:
+        raise ValueError(
+            f'cube.dat: expected {N_COLUMNS} columns per line in the block starting '
+            f'at line {line_offset + 1}'
+        )
+    return np.array(tokens, dtype=np.float64).reshape(-1, N_COLUMNS)
+
+
+def read_cube_dat(
+    file: IO, chunk_size: int = CHUNK_SIZE, skip_lines: int = 1
+) -> CubeData:
+    '''
+    Reads a `cube.dat` file from an open (binary or text) file object.
+
+    Args:
+        file: The open file.
+        chunk_size: Number of bytes (or characters) read at once.
+        skip_lines: Number of leading lines that are skipped. The first line of a
+            `cube.dat` file is treated as a header.
+
+    Returns:
+        CubeData with the integer flag column as `time` and float64 `H_ex` and `M`.
+    '''
+    size = _file_size(file)
+    buffer = _ColumnBuffer()
+    rest = None
+    line = 0
+    while True:
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        data = rest + chunk if rest else chunk
+        if not data:
+            break
+        newline = b'\n' if isinstance(data, bytes) else '\n'
+        if eof:
+            block, rest = data, None
+        else:
+            cut = data.rfind(newline) + 1
+            block, rest = data[:cut], data[cut:]
+            if not block:
+                # a single line longer than the chunk size
+                rest = data
+                continue
+
+        while skip_lines > 0 and block:
+            pos = block.find(newline)
+            block = block[pos + 1 :] if pos != -1 else block[:0]
+            skip_lines -= 1
+            line += 1
+
+        if block.strip():
+            values = _parse_block(block, line)
+            if buffer.size == 0 and size:
+                buffer.reserve(int(size / len(block) * len(values) * 1.05) + 1)
+            buffer.append(values)
+            line += block.count(newline)
+        if eof:
+            break
+    return buffer.finish()
@@ -0,0 +1,83 @@
+'''
+Readers for the Monte Carlo (spin dynamics) input files `posfile`, `momfile` and
+`jfile` in the UppASD format.
+
+The files are read with the C tokenizer of `np.loadtxt` in one call per file, so
+there is no Python loop per line. Comments start with `#`.
+
+- posfile: `atom type x y z`, or `type x y z` with implicit atom numbers
+- momfile: `atom chemical_type moment mx my mz`
+- jfile: `i j rx ry rz J`, additional columns are ignored
+'''
+
+from typing import IO, NamedTuple
+
+import numpy as np
+
+
+class Positions(NamedTuple):
+    atoms: np.ndarray
+    types: np.ndarray
+    positions: np.ndarray
+
+
+class Moments(NamedTuple):
+    atoms: np.ndarray
+    types: np.ndarray
+    moments: np.ndarray
+    directions: np.ndarray
+
+
+class Exchange(NamedTuple):
+    i: np.ndarray
+    j: np.ndarray
+    r: np.ndarray
+    J: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.J)
+
+
+def read_table(file: IO, min_columns: int) -> np.ndarray:
+    '''
+    Reads a whitespace separated numeric table as float64 array of shape
+    (rows, columns). All rows must have the same number of columns.
+    '''
+    table = np.loadtxt(file, comments='#', ndmin=2, dtype=np.float64)
+    if table.size == 0:
+        return np.empty((0, min_columns))
+    if table.shape[1] < min_columns:
+        raise ValueError(
+            f'expected at least {min_columns} columns, found {table.shape[1]}'
+        )
+    return table
+
+
+def read_posfile(file: IO) -> Positions:
+    table = read_table(file, 4)
+    if table.shape[1] == 4:  # noqa: PLR2004
+        atoms = np.arange(1, len(table) + 1)
+        return Positions(atoms, table[:, 0].astype(np.int64), table[:, 1:4])
+    return Positions(
+        table[:, 0].astype(np.int64), table[:, 1].astype(np.int64), table[:, 2:5]
+    )
+
+
+def read_momfile(file: IO) -> Moments:
+    table = read_table(file, 6)
+    return Moments(
+        table[:, 0].astype(np.int64),
+        table[:, 1].astype(np.int64),
+        table[:, 2].copy(),
+        table[:, 3:6],
+    )
+
+
+def read_jfile(file: IO) -> Exchange:
+    table = read_table(file, 6)
+    return Exchange(
+        table[:, 0].astype(np.int64),
+        table[:, 1].astype(np.int64),
+        np.ascontiguousarray(table[:, 2:5]),
+        table[:, 5].copy(),
+    )
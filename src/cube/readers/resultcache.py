@@ -0,0 +1,172 @@
+'''
+Persistent cache for values derived from raw files.
+
+The values are stored as JSON in a SQLite database under a cache directory, the
+cache is only used if a cache directory is configured. The entries are keyed by
+the inputs they were derived from and a fingerprint of the code that derived them,
+so changed code never returns stale values. The number of entries is bounded, the
+least recently used entries are evicted first.
+'''
+
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Optional
+
+DEFAULT_MAX_ENTRIES = 10000
+DATABASE_NAME = 'results.sqlite'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL
+)
+'''
+_LAST_USED_INDEX = (
+    'CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)'
+)
+
+
+def _version(distribution: str) -> str:
+    try:
+        return version(distribution)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+@functools.cache
+def code_version(modules: tuple[str, ...] = ()) -> str:
+    '''
+    Returns a fingerprint of the code that derives cached values: the versions of
+    the plugin and of NOMAD, and the sha256 of the source of every module in
+    `modules`. It is part of every key, so editing one of the modules invalidates
+    the values it derived.
+    '''
+    digest = hashlib.sha256()
+    for distribution in ('cube', 'nomad-lab'):
+        digest.update(f'{distribution}={_version(distribution)};'.encode())
+    for module in modules:
+        spec = importlib.util.find_spec(module)
+        with open(spec.origin, 'rb') as file:
+            digest.update(f'{module}:'.encode() + file.read())
+    return digest.hexdigest()
+
+
+def result_key(
+    namespace: str, digests: dict[str, str], modules: tuple[str, ...] = ()
+) -> str:
+    '''
+    Returns the cache key for the values derived by `namespace` from input files
+    with the given `digests` (role -> content hash or other version of the file),
+    with the code in `modules`.
+    '''
+    content = json.dumps(
+        [namespace, code_version(tuple(modules)), sorted(digests.items())],
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ResultCache:
+    '''
+    Size-bounded, least recently used cache of JSON values in a SQLite database.
+
+    Every operation opens its own connection, so instances can be shared between
+    threads and the database between processes.
+    '''
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = os.path.join(cache_dir, DATABASE_NAME)
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(_SCHEMA)
+                connection.execute(_LAST_USED_INDEX)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[dict]:
+        '''
+        Returns the values stored under `key` and marks them as recently used, or
+        None if there are none or the database cannot be read.
+        '''
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            return None
+        try:
+            with connection:
+                row = connection.execute(
+                    'SELECT value FROM results WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    'UPDATE results SET last_used = ? WHERE key = ?',
+                    (time.time(), key),
+                )
+        except sqlite3.Error:
+            return None
+        finally:
+            connection.close()
+        return json.loads(row[0])
+
+    def put(self, key: str, values: dict) -> None:
+        '''
+        Stores `values` under `key` and evicts the least recently used entries
+        beyond `max_entries`. Nothing is stored if the database cannot be written.
+        '''
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            return
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO results (key, value, last_used) '
+                    'VALUES (?, ?, ?)',
+                    (key, json.dumps(values), time.time()),
+                )
+                connection.execute(
+                    'DELETE FROM results WHERE key IN ('
+                    'SELECT key FROM results ORDER BY last_used DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+        finally:
+            connection.close()
+
+    def __len__(self) -> int:
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        finally:
+            connection.close()
+
+
+def open_result_cache(
+    cache_dir: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES
+) -> Optional[ResultCache]:
+    '''
+    Opens the result cache in `cache_dir`. Returns None if no `cache_dir` is set or
+    the cache cannot be opened, since the cache is an optimisation only.
+    '''
+    if not cache_dir:
+        return None
+    try:
+        return ResultCache(cache_dir, max_entries)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,163 @@
+'''
+Columnar import of the SQLite results database of a B4Vex optimisation.
+
+The rows of a table are fetched in batches with `fetchmany` and converted to one
+array per column, so memory is bounded by the arrays plus a single batch. Rows are
+read in `rowid` order, which allows an incremental import of only the rows that
+were added after the last imported `rowid`.
+'''
+
+import pathlib
+import sqlite3
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 10000
+
+_NUMERIC_AFFINITIES = ('INT', 'REAL', 'FLOA', 'DOUB', 'NUM', 'DEC', 'BOOL')
+
+
+class TableData(NamedTuple):
+    '''
+    The rows of a table, column by column.
+
+    Attributes:
+        table: The name of the table.
+        after_rowid: The rows were read after this `rowid`. It is 0 if the
+            requested `rowid` is above the largest one in the table, e.g. because
+            the database was replaced.
+        rowids: The `rowid` of every row.
+        numeric: The values of every numeric column as float64, NULL as NaN.
+        text: The values of every other column as str, NULL as ''.
+    '''
+
+    table: str
+    after_rowid: int
+    rowids: np.ndarray
+    numeric: dict
+    text: dict
+
+
+def connect(path: str) -> sqlite3.Connection:
+    '''
+    Opens the database at the OS path `path` read-only.
+    '''
+    uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True)
+
+
+def table_names(connection: sqlite3.Connection) -> list[str]:
+    return [
+        row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    ]
+
+
+def choose_table(connection: sqlite3.Connection, preferred=()) -> str:
+    '''
+    Returns the first table in `preferred` that exists, or the only table of the
+    database.
+    '''
+    tables = table_names(connection)
+    for name in preferred:
+        if name in tables:
+            return name
+    if len(tables) != 1:
+        raise ValueError(f'cannot choose the results table from {tables}')
+    return tables[0]
+
+
+def _is_numeric(declared_type: str) -> bool:
+    declared_type = declared_type.upper()
+    return any(affinity in declared_type for affinity in _NUMERIC_AFFINITIES)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def read_table(
+    connection: sqlite3.Connection,
+    table: str,
+    after_rowid: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TableData:
+    '''
+    Reads the rows of `table` with a `rowid` above `after_rowid`, or all rows if
+    there is no such `rowid`.
+
+    Columns with a numeric declared type are returned as float64 arrays. Columns
+    without a declared type count as numeric if all their values in the first
+    batch are numbers or NULL.
+    '''
+    # numpy integers would be bound as blobs
+    after_rowid = int(after_rowid)
+    last = connection.execute(f'SELECT MAX(rowid) FROM {_quote(table)}').fetchone()
+    if after_rowid > (last[0] or 0):
+        after_rowid = 0
+    columns = connection.execute(f'PRAGMA table_info({_quote(table)})').fetchall()
+    names = [column[1] for column in columns]
+    numeric = [_is_numeric(column[2]) for column in columns]
+    undeclared = [not column[2] for column in columns]
+
+    cursor = connection.execute(
+        f'SELECT rowid, {", ".join(_quote(name) for name in names)} '
+        f'FROM {_quote(table)} WHERE rowid > ? ORDER BY rowid',
+        (after_rowid,),
+    )
+    rowids = []
+    chunks = [[] for _ in names]
+    first = True
+    while batch := cursor.fetchmany(batch_size):
+        values = list(zip(*batch))
+        if first:
+            for i, is_undeclared in enumerate(undeclared):
+                if is_undeclared:
+                    numeric[i] = all(
+                        value is None or isinstance(value, (int, float))
+                        for value in values[i + 1]
+                    )
+            first = False
+        rowids.append(np.array(values[0], dtype=np.int64))
+        for i, column in enumerate(values[1:]):
+            if numeric[i]:
+                chunks[i].append(np.array(column, dtype=np.float64))
+            else:
+                chunks[i].extend('' if value is None else str(value)
+                                 for value in column)
+    cursor.close()
+
+    def concatenate(i: int) -> np.ndarray:
+        return np.concatenate(chunks[i]) if chunks[i] else np.empty(0)
+
+    return TableData(
+        table=table,
+        after_rowid=after_rowid,
+        rowids=np.concatenate(rowids) if rowids else np.empty(0, dtype=np.int64),
+        numeric={
+            name: concatenate(i) for i, name in enumerate(names) if numeric[i]
+        },
+        text={name: chunks[i] for i, name in enumerate(names) if not numeric[i]},
+    )
+
+
+def read_results_db(
+    path: str,
+    table: Optional[str] = None,
+    after_rowid: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    preferred_tables=(),
+) -> TableData:
+    '''
+    Reads the rows added after `after_rowid` from the results database at the OS
+    path `path`. The table is `table`, or chosen by `choose_table`.
+    '''
+    connection = connect(path)
+    try:
+        if table is None:
+            table = choose_table(connection, preferred_tables)
+        return read_table(connection, table, after_rowid, batch_size)
+    finally:
+        connection.close()
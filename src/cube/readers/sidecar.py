@@ -0,0 +1,157 @@
+'''
+Binary sidecar cache for parsed `cube.dat` content.
+
+The parsed columns are written once as `.npy` files into a cache directory. The
+files are keyed by the content hash and the size of the source file, so any later
+read of the same content opens them with `np.load(mmap_mode='r')` instead of
+parsing the text again. The cache is unbounded, so it is only used if a cache
+directory is configured.
+'''
+
+import hashlib
+import os
+import tempfile
+from typing import IO, Optional
+
+import numpy as np
+
+from cube.readers.cubedat import CubeData, read_cube_dat
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(file: IO, chunk_size: int = HASH_CHUNK_SIZE) -> tuple[str, int]:
+    '''
+    Returns the sha256 hex digest and the size in bytes of the content of an open
+    binary file. The file is read from its current position to the end.
+    '''
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := file.read(chunk_size):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def file_stat(file: IO) -> tuple[Optional[int], Optional[float]]:
+    '''
+    Returns the size and the modification time of an open file, or None for
+    values that are not available (e.g. for in-memory files).
+    '''
+    try:
+        stat = os.fstat(file.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None, None
+    return stat.st_size, stat.st_mtime
+
+
+def sidecar_paths(cache_dir: str, key: str) -> dict[str, str]:
+    return {
+        column: os.path.join(cache_dir, key[:2], f'{key}.{column}.npy')
+        for column in CubeData._fields
+    }
+
+
+def load_sidecar(cache_dir: str, key: str) -> Optional[CubeData]:
+    '''
+    Opens the memory-mapped columns stored under `key`, or returns None if there
+    is no complete sidecar.
+    '''
+    try:
+        return CubeData(
+            **{
+                column: np.load(path, mmap_mode='r')
+                for column, path in sidecar_paths(cache_dir, key).items()
+            }
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def write_sidecar(cache_dir: str, key: str, data: CubeData) -> None:
+    '''
+    Stores the columns under `key`. Every column is written to a temporary file
+    first and moved into place, so readers never see partially written files.
+    '''
+    for column, path in sidecar_paths(cache_dir, key).items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.save(file, getattr(data, column))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class _HashingReader:
+    '''
+    File wrapper that hashes everything that is read through it.
+    '''
+
+    def __init__(self, file: IO):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1):
+        chunk = self.file.read(size)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+
+def read_and_cache_cube_dat(
+    file: IO, cache_dir: Optional[str] = None
+) -> tuple[CubeData, str, int]:
+    '''
+    Parses a `cube.dat` file from an open binary file and hashes its content in the
+    same single read. The parsed columns are written to the sidecar cache in
+    `cache_dir`, if given.
+
+    Returns:
+        The parsed data, the sha256 hex digest and the size of the content.
+    '''
+    reader = _HashingReader(file)
+    data = read_cube_dat(reader)
+    digest = reader.digest.hexdigest()
+    if cache_dir:
+        try:
+            write_sidecar(cache_dir, f'{digest}-{reader.size}', data)
+        except OSError:
+            pass
+    return data, digest, reader.size
+
+
+def load_cube_dat(
+    file: IO, cache_dir: Optional[str] = None, key: Optional[str] = None
+) -> CubeData:
+    '''
+    Reads a `cube.dat` file from an open binary file through the sidecar cache.
+
+    Args:
+        file: The open, seekable binary file.
+        cache_dir: The sidecar directory. If None or empty, the file is parsed
+            without caching.
+        key: The sidecar key, if already known. Otherwise it is computed from
+            the content hash and size of the file.
+    '''
+    if not cache_dir:
+        return read_cube_dat(file)
+    if key is None:
+        key = '{}-{}'.format(*file_digest(file))
+        file.seek(0)
+
+    data = load_sidecar(cache_dir, key)
+    if data is None:
+        data = read_cube_dat(file)
+        try:
+            write_sidecar(cache_dir, key, data)
+        except OSError:
+            # the cache is an optimisation only, e.g. the directory may be read-only
+            pass
+    return data
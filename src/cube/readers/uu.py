@@ -0,0 +1,186 @@
+'''
+Readers for the output files of the UU ground state calculations (`out_last`,
+`out_MF_*`).
+
+Values are printed as lines of the form `<site> ... <label> <v1> <v2> ...`, where
+the first token of a line identifies the site. For every label only the values of
+the last line per site are of interest.
+'''
+
+import mmap
+import os
+import re
+from typing import IO, AnyStr
+
+import numpy as np
+
+TOTAL_MOMENT = 'Total moment [J=L+S] (mu_B):'
+DIRECTION_OF_J = 'Direction of J (Cartesian):'
+UNIT_CELL_VOLUME = 'unit cell volume:'
+EIGENVALUE_SUM = 'Eigenvalue sum:'
+
+TAIL_BLOCK_SIZE = 1 << 16
+# header values are searched in this many bytes at the start of a file
+HEAD_SIZE = 1 << 20
+
+
+def _encode(value: str, like: AnyStr) -> AnyStr:
+    return value.encode() if isinstance(like, bytes) else value
+
+
+def compile_labels(labels: list[str], like: AnyStr = '') -> re.Pattern:
+    '''
+    Returns one pattern that matches every line containing one of the labels. The
+    groups are the first token of the line, the label and the rest of the line.
+    '''
+    alternatives = '|'.join(re.escape(label) for label in labels)
+    pattern = rf'^[ \t]*(?=(\S+))[^\n]*?({alternatives})([^\n]*)'
+    return re.compile(_encode(pattern, like), re.MULTILINE)
+
+
+def _values(rest: AnyStr) -> list[float]:
+    return [float(x) for x in rest.split()]
+
+
+def scan_last_values(
+    text: AnyStr, labels: list[str]
+) -> dict[str, dict[str, list[float]]]:
+    '''
+    Scans `text` once for all `labels` and returns, per label, the values of the
+    last line of every site. Only the surviving lines are converted to floats.
+    '''
+    last: dict[str, dict] = {label: {} for label in labels}
+    by_label = {_encode(label, text): last[label] for label in labels}
+    for match in compile_labels(labels, text).finditer(text):
+        by_label[match[2]][match[1]] = match[3]
+
+    def key(site):
+        return site.decode() if isinstance(site, bytes) else site
+
+    return {
+        label: {key(site): _values(rest) for site, rest in sites.items()}
+        for label, sites in last.items()
+    }
+
+
+def _block_reader(file: IO):
+    '''
+    Returns the size of an open binary file and a function reading the bytes
+    [start, end) from it, memory-mapping the file if possible.
+    '''
+    try:
+        size = os.fstat(file.fileno()).st_size
+        if size > 0:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return size, lambda start, end: mapped[start:end]
+    except (AttributeError, OSError, ValueError):
+        size = file.seek(0, os.SEEK_END)
+
+    def read(start: int, end: int) -> bytes:
+        file.seek(start)
+        return file.read(end - start)
+
+    return size, read
+
+
+def scan_last_values_reverse(
+    file: IO, labels: list[str], block_size: int = TAIL_BLOCK_SIZE
+) -> dict[str, dict[str, list[float]]]:
+    '''
+    Like `scan_last_values`, but scans an open binary file backwards from its end
+    in blocks of `block_size` bytes.
+
+    A label is complete as soon as one of its sites is seen a second time, i.e.
+    the scan has reached the previous iteration of the output. The scan stops
+    when all labels are complete, so for iterative outputs only the last
+    iteration is read. Labels that are printed only once are searched up to the
+    start of the file.
+    '''
+    size, read = _block_reader(file)
+    pattern = compile_labels(labels, b'')
+    last: dict[bytes, dict] = {label.encode(): {} for label in labels}
+    complete = set()
+    end = size
+    carry = b''
+    while end > 0 and len(complete) < len(labels):
+        start = max(0, end - block_size)
+        block = read(start, end) + carry
+        carry = b''
+        if start > 0:
+            # the first line may continue in the previous block
+            newline = block.find(b'\n')
+            if newline == -1:
+                carry, end = block, start
+                continue
+            carry, block = block[:newline], block[newline + 1 :]
+
+        for match in reversed(list(pattern.finditer(block))):
+            label, site = match[2], match[1]
+            if label in complete:
+                continue
+            if site in last[label]:
+                complete.add(label)
+            else:
+                last[label][site] = match[3]
+        end = start
+
+    # the sites were found from the end, restore the order of the file
+    return {
+        label.decode(): {
+            site.decode(): _values(rest) for site, rest in reversed(sites.items())
+        }
+        for label, sites in last.items()
+    }
+
+
+def scan_first_values(
+    file: IO,
+    labels: list[str],
+    block_size: int = TAIL_BLOCK_SIZE,
+    limit: int = HEAD_SIZE,
+) -> dict[str, dict[str, list[float]]]:
+    '''
+    Scans an open binary file forwards from its start for labels that are printed
+    once, e.g. in the header of an output. Returns, per label, the values of its
+    first line. The scan stops when all labels are found or after `limit` bytes;
+    labels that are not found map to an empty dict.
+    '''
+    size, read = _block_reader(file)
+    end = min(size, limit)
+    pattern = compile_labels(labels, b'')
+    first: dict[bytes, dict] = {label.encode(): {} for label in labels}
+    start = 0
+    carry = b''
+    while start < end and not all(first.values()):
+        block = carry + read(start, min(start + block_size, end))
+        start = min(start + block_size, end)
+        carry = b''
+        if start < end:
+            # the last line may continue in the next block
+            newline = block.rfind(b'\n')
+            if newline == -1:
+                carry = block
+                continue
+            block, carry = block[: newline + 1], block[newline + 1 :]
+
+        for match in pattern.finditer(block):
+            if not first[match[2]]:
+                first[match[2]][match[1]] = match[3]
+
+    return {
+        label.decode(): {site.decode(): _values(rest) for site, rest in sites.items()}
+        for label, sites in first.items()
+    }
+
+
+def site_array(values: dict[str, list[float]], sites: list[str]) -> np.ndarray:
+    '''
+    Returns the values of the given sites as array of shape (sites, components).
+    '''
+    if not sites:
+        return np.empty((0, 0))
+    rows = [values[site] for site in sites]
+    array = np.array(rows, dtype=np.float64)
+    if array.ndim != 2:  # noqa: PLR2004
+        raise ValueError('sites have different numbers of components')
+    return array
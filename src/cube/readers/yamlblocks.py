@@ -0,0 +1,67 @@
+'''
+Block-wise reading of YAML configuration files.
+
+A configuration file is split into its top-level blocks (a key at column 0 and
+the indented lines below it) without parsing it. Every block can then be hashed
+and parsed on its own, so blocks that are shared by many files only need to be
+parsed once.
+'''
+
+import hashlib
+import re
+from typing import Optional
+
+_BLOCK_START_RE = re.compile(r'^(?=[A-Za-z_][\w-]*[ \t]*:)', re.MULTILINE)
+_BLOCK_KEY_RE = re.compile(r'([A-Za-z_][\w-]*)[ \t]*:')
+_IGNORED_LINE_RE = re.compile(r'[ \t]*(?:#.*)?')
+
+
+def load_yaml(text: str):
+    '''
+    Parses a YAML document with the fastest available safe loader.
+    '''
+    import yaml  # noqa: PLC0415
+
+    # the C-accelerated loader is only available if PyYAML was built with libyaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+def canonical_block(text: str) -> str:
+    '''
+    Returns the block without comment-only lines, blank lines and trailing
+    whitespace, so blocks that differ only in these hash to the same value.
+    '''
+    lines = (line.rstrip() for line in text.splitlines())
+    return '\n'.join(
+        line for line in lines if not _IGNORED_LINE_RE.fullmatch(line)
+    )
+
+
+def block_digest(text: str) -> str:
+    '''
+    Returns the sha256 hex digest of the canonical form of a block.
+    '''
+    return hashlib.sha256(canonical_block(text).encode()).hexdigest()
+
+
+def split_blocks(text: str) -> Optional[dict[str, str]]:
+    '''
+    Returns the text of every top-level block by its key, or None if the document
+    cannot be split safely, e.g. because it uses document markers, anchors or
+    flow style at the top level, or repeats a key.
+    '''
+    chunks = _BLOCK_START_RE.split(text)
+    if any(not _IGNORED_LINE_RE.fullmatch(line) for line in chunks[0].splitlines()):
+        return None
+    if '&' in text or '*' in text:
+        # anchors and aliases may refer across blocks
+        return None
+
+    blocks = {}
+    for chunk in chunks[1:]:
+        key = _BLOCK_KEY_RE.match(chunk)[1]
+        if key in blocks:
+            return None
+        blocks[key] = chunk
+    return blocks
@@ -1,10 +1,43 @@
+from typing import Optional
+
 from nomad.config.models.plugins import SchemaPackageEntryPoint
+from pydantic import Field
+
+
+def get_entry_point_setting(entry_point_id: str, name: str, default):
+    '''
+    Returns the configured value of `name` on the plugin entry point
+    `entry_point_id`, or `default` if the entry point is not configured (e.g. when
+    the schema is used outside of a NOMAD installation).
+    '''
+    try:
+        from nomad.config import config  # noqa: PLC0415
+
+        entry_point = config.get_plugin_entry_point(entry_point_id)
+    except Exception:
+        return default
+    return getattr(entry_point, name, default)
 
 
 class CubeEntryPoint(SchemaPackageEntryPoint):
+    row_view_limit: int = Field(
+        1000,
+        description='Maximum number of steps for which the per-step `Row` view is '
+        'created next to the array quantities.',
+    )
+    max_plot_points: int = Field(
+        10000,
+        description='Maximum number of points shown in the hysteresis figure. '
+        'Larger loops are downsampled for plotting only, 0 disables downsampling.',
+    )
+    sidecar_cache_dir: Optional[str] = Field(
+        None,
+        description='Directory for the binary sidecar cache of parsed data files. '
+        'The cache is not bounded in size and disabled if no directory is set.',
+    )
 
     def load(self):
-        from cube.schema_packages.cube import m_package
+        from cube.schema_packages.cube import m_package  # noqa: PLC0415
 
         return m_package
 
@@ -15,9 +48,35 @@ cube = CubeEntryPoint(
 )
 
 class TmrEntryPoint(SchemaPackageEntryPoint):
+    row_view_limit: int = Field(
+        1000,
+        description='Maximum number of steps for which the per-step `Row` view is '
+        'created next to the array quantities.',
+    )
+    max_plot_points: int = Field(
+        10000,
+        description='Maximum number of points shown in the hysteresis figure. '
+        'Larger loops are downsampled for plotting only, 0 disables downsampling.',
+    )
+    sidecar_cache_dir: Optional[str] = Field(
+        None,
+        description='Directory for the binary sidecar cache of parsed data files. '
+        'The cache is not bounded in size and disabled if no directory is set.',
+    )
+
+    database_batch_size: int = Field(
+        10000,
+        description='Number of rows fetched at once from the results database of '
+        'a B4Vex run.',
+    )
+    database_table: Optional[str] = Field(
+        None,
+        description='The table of the results database to import. Defaults to the '
+        'table named like the database in the configuration, or the only table.',
+    )
 
     def load(self):
-        from cube.schema_packages.tmrshape import m_package
+        from cube.schema_packages.tmrshape import m_package  # noqa: PLC0415
 
         return m_package
 
@@ -30,7 +89,7 @@ tmr = TmrEntryPoint(
 class OntoEntryPoint(SchemaPackageEntryPoint):
 
     def load(self):
-        from cube.schema_packages.mammos_ontology import m_package
+        from cube.schema_packages.mammos_ontology import m_package  # noqa: PLC0415
 
         return m_package
 
@@ -41,9 +100,21 @@ onto = OntoEntryPoint(
 )
 
 class UUEntryPoint(SchemaPackageEntryPoint):
+    result_cache_dir: Optional[str] = Field(
+        None,
+        description='Directory for the persistent cache of K1, Ms and the unit '
+        'cell volume, keyed by the sizes and modification times of the input files '
+        'and checked against their content hashes. The cache is disabled if no '
+        'directory is set.',
+    )
+    result_cache_size: int = Field(
+        10000,
+        description='Maximum number of entries in the result cache. The least '
+        'recently used entries are evicted first.',
+    )
 
     def load(self):
-        from cube.schema_packages.uu_schema import m_package
+        from cube.schema_packages.uu_schema import m_package  # noqa: PLC0415
 
         return m_package
 
@@ -17,12 +17,12 @@
 #
 
 from typing import (
+    IO,
     TYPE_CHECKING,
+    Optional,
 )
 
 import numpy as np
-import pandas as pd
-import plotly.express as px
 from nomad.datamodel.data import (
     ArchiveSection,
     EntryData,
@@ -43,8 +43,93 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
+from cube.analysis.downsample import downsample_indices
+from cube.analysis.hysteresis import analyse_loop
+from cube.readers.sidecar import file_digest, file_stat, load_cube_dat
+from cube.schema_packages import get_entry_point_setting
+
 m_package = Package(name='Schema for cube.dat')
 
+ENTRY_POINT_ID = 'cube.schema_packages:cube'
+FIGURE_LABEL = 'figure 1'
+
+
+class RawFileFingerprint(ArchiveSection):
+    '''
+    Size, modification time and content hash of a raw file that was read during
+    normalization.
+    '''
+    m_def = Section()
+
+    path = Quantity(
+        type=str,
+        description='The path of the raw file.',
+    )
+    size = Quantity(
+        type=np.int64,
+        description='The size of the raw file in bytes.',
+    )
+    mtime = Quantity(
+        type=np.float64,
+        description='The modification time of the raw file as POSIX timestamp.',
+    )
+    sha256 = Quantity(
+        type=str,
+        description='The sha256 hex digest of the content of the raw file.',
+    )
+
+
+def update_fingerprint(
+    section, path: str, file: IO, fingerprints: Optional[dict] = None
+) -> tuple[bool, Optional[str]]:
+    '''
+    Compares the open binary raw `file` with the fingerprint recorded for `path` in
+    `section.input_fingerprints` and records its current fingerprint.
+
+    The content is only hashed if size or modification time differ from the
+    recorded ones. The file position is left at the start of the file. Sections
+    with many input files can pass the fingerprints by path as `fingerprints`,
+    which is kept up to date, instead of searching them for every file.
+
+    Returns:
+        Whether the content is unchanged, and the sidecar key of the content if it
+        has been hashed.
+    '''
+    size, mtime = file_stat(file)
+    if fingerprints is not None:
+        previous = fingerprints.get(path)
+    else:
+        previous = None
+        for fingerprint in section.input_fingerprints:
+            if fingerprint.path == path:
+                previous = fingerprint
+    if (previous is not None and mtime is not None
+            and previous.size == size and previous.mtime == mtime):
+        return True, None
+
+    digest, size = file_digest(file)
+    file.seek(0)
+    unchanged = previous is not None and previous.sha256 == digest
+    if previous is None:
+        previous = RawFileFingerprint(path=path)
+        section.input_fingerprints.append(previous)
+        if fingerprints is not None:
+            fingerprints[path] = previous
+    previous.size = size
+    previous.mtime = mtime
+    previous.sha256 = digest
+    return unchanged, f'{digest}-{size}'
+
+
+def replace_figure(section, figure: PlotlyFigure) -> None:
+    '''
+    Replaces the figure with the same label in `section.figures`, so repeated
+    normalization does not add more figures.
+    '''
+    section.figures = [
+        f for f in section.figures if f.label != figure.label
+    ] + [figure]
+
 
 class Row(ArchiveSection):
     m_def = Section(
@@ -58,6 +143,14 @@ class Row(ArchiveSection):
             }
         },)
 
+    time = Quantity(
+        type=np.int64,
+        description='Time step',
+    )
+    H_ex = Quantity(
+        type=np.float64,
+        description='External field',
+    )
     M = Quantity(
         type=np.float64,
         description='Magnetisation',
@@ -80,6 +173,72 @@ class Row(ArchiveSection):
         super().normalize(archive, logger)
 
 
+class HysteresisSummary(ArchiveSection):
+    '''
+    Characteristic values of the hysteresis loop, computed from the arrays of the
+    `Cube` entry.
+    '''
+    m_def = Section()
+
+    coercive_fields = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='Fields at which the magnetisation crosses zero, in sweep order.',
+    )
+    coercive_field = Quantity(
+        type=np.float64,
+        description='Mean absolute value of the coercive fields.',
+    )
+    remanent_magnetisations = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='Magnetisations at which the field crosses zero, in sweep '
+        'order.',
+    )
+    remanent_magnetisation = Quantity(
+        type=np.float64,
+        description='Mean absolute value of the remanent magnetisations.',
+    )
+    saturation_magnetisation = Quantity(
+        type=np.float64,
+        description='Maximum absolute magnetisation.',
+    )
+    loop_area = Quantity(
+        type=np.float64,
+        description='Absolute integral of M dH along the sweep.',
+    )
+    n_branches = Quantity(
+        type=np.int64,
+        description='Number of branches, separated by sign changes of dH.',
+    )
+    switching_fields = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='Field of the steepest magnetisation change of every branch.',
+    )
+    switching_field_widths = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='Width of the switching-field distribution of every branch, '
+        'the standard deviation of the field weighted by |dM|.',
+    )
+
+    def setFromLoop(self, H_ex: np.ndarray, M: np.ndarray) -> None:
+        summary = analyse_loop(H_ex, M)
+        self.coercive_fields = summary.coercive_fields
+        if len(summary.coercive_fields):
+            self.coercive_field = float(np.mean(np.abs(summary.coercive_fields)))
+        self.remanent_magnetisations = summary.remanent_magnetisations
+        if len(summary.remanent_magnetisations):
+            self.remanent_magnetisation = float(
+                np.mean(np.abs(summary.remanent_magnetisations)))
+        self.saturation_magnetisation = summary.saturation_magnetisation
+        self.loop_area = summary.loop_area
+        self.n_branches = summary.n_branches
+        self.switching_fields = summary.switching_fields
+        self.switching_field_widths = summary.switching_field_widths
+
+
 class Cube(PlotSection, EntryData, ArchiveSection):
     '''
     Class autogenerated from yaml schema.
@@ -88,6 +247,23 @@ class Cube(PlotSection, EntryData, ArchiveSection):
     steps = SubSection(
         section_def=Row,
         repeats=True,
+        description='Per-step view of the data, only created for small files. '
+        'The array quantities `time`, `H_ex` and `M` hold the full data.',
+    )
+    time = Quantity(
+        type=np.int64,
+        shape=['*'],
+        description='Time step of every step in the data file.',
+    )
+    H_ex = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='External field of every step in the data file.',
+    )
+    M = Quantity(
+        type=np.float64,
+        shape=['*'],
+        description='Magnetisation of every step in the data file.',
     )
     data_file = Quantity(
         type=str,
@@ -96,6 +272,16 @@ class Cube(PlotSection, EntryData, ArchiveSection):
             "component": "FileEditQuantity",
         },
     )
+    summary = SubSection(
+        section_def=HysteresisSummary,
+        repeats=False,
+    )
+    input_fingerprints = SubSection(
+        section_def=RawFileFingerprint,
+        repeats=True,
+        description='Fingerprints of the raw files read during normalization. '
+        'Normalization is skipped for files that did not change.',
+    )
 
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         '''
@@ -107,35 +293,56 @@ class Cube(PlotSection, EntryData, ArchiveSection):
             logger (BoundLogger): A structlog logger.
         '''
         super().normalize(archive, logger)
+        changed = False
         if self.data_file:
-          with archive.m_context.raw_file(self.data_file) as file:
-            df = pd.read_csv(file, sep=' ', header=0, names=['time', 'H_ex', 'M'])
-          steps = []
-          for i, row in df.iterrows():
-            # print(row)
-            step = Row()
-            step.time = row['time']
-            step.H_ex = row['H_ex']
-            step.M = row['M']
-            # step.duration = ureg.Quantity(float(row['duration [min]']), 'min')
-            # step.initial_temperature = 
-            #   ureg.Quantity(row['initial temperature [C]'], 'celsius')
-            # step.final_temperature = 
-            #   ureg.Quantity(row['final temperature [C]'], 'celsius')
-            steps.append(step)
-        self.steps = steps
-
-        x = [s.H_ex for s in self.steps]
-        y = [s.M for s in self.steps]
-        figure2 = px.scatter(x=x, y=y, 
+          cache_dir = get_entry_point_setting(ENTRY_POINT_ID, 'sidecar_cache_dir',
+                                              None)
+          with archive.m_context.raw_file(self.data_file, 'rb') as file:
+            unchanged, key = update_fingerprint(self, self.data_file, file)
+            if not unchanged or self.H_ex is None:
+              data = load_cube_dat(file, cache_dir, key=key)
+              changed = True
+          if changed:
+            self.time, self.H_ex, self.M = data
+            self.createRowView()
+
+        if self.H_ex is None or len(self.H_ex) == 0:
+          return
+        if (changed or self.summary is None) and len(self.H_ex) > 1:
+          self.summary = HysteresisSummary()
+          self.summary.setFromLoop(self.H_ex, self.M)
+        if not changed and any(f.label == FIGURE_LABEL for f in self.figures):
+          return
+        # plotly.express is slow to import, so it is only loaded for figures
+        import plotly.express as px  # noqa: PLC0415
+
+        max_points = get_entry_point_setting(ENTRY_POINT_ID, 'max_plot_points',
+                                             10000)
+        shown = downsample_indices(self.H_ex, self.M, max_points)
+        figure2 = px.scatter(x=self.H_ex[shown], y=self.M[shown],
                              labels={
                                 "x": "H_ex",
                                 "y": "M"
                              },
                              title="Figure title")
-        self.figures.append(PlotlyFigure(label='figure 1', index=1, 
-                                         figure=figure2.to_plotly_json()))
+        replace_figure(self, PlotlyFigure(label=FIGURE_LABEL, index=1,
+                                          figure=figure2.to_plotly_json()))
 
+    def createRowView(self) -> None:
+        '''
+        Creates the per-step `Row` sections from the array quantities if the number
+        of steps does not exceed the configured `row_view_limit`. For larger files
+        only the arrays are kept.
+        '''
+        limit = get_entry_point_setting(ENTRY_POINT_ID, 'row_view_limit', 1000)
+        if len(self.H_ex) > limit:
+          self.steps = []
+          return
+        self.steps = [
+          Row(time=time, H_ex=H_ex, M=M)
+          for time, H_ex, M in zip(self.time.tolist(), self.H_ex.tolist(),
+                                   self.M.tolist())
+        ]
 
 m_package.__init_metainfo__()
 
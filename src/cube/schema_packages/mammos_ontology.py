@@ -14,6 +14,9 @@ from nomad.metainfo import (
   Section,
   SubSection,
 )
+from nomad.units import ureg
+
+from cube.readers.cif import read_cif
 
 if TYPE_CHECKING:
   from nomad.datamodel.datamodel import (
@@ -378,7 +381,7 @@ Subclass of:
   )
   data_file = Quantity(
     type=str,
-    description='A test.',
+    description='The CIF file of the crystal structure.',
     a_eln={
         "component": "FileEditQuantity",
     },
@@ -386,7 +389,8 @@ Subclass of:
 
   def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
     '''
-    The normalizer for the `B4VexSimulation` class.
+    The normalizer for the `CrystalStructure` class. Reads the cell parameters and
+    the space group from the CIF file in `data_file`.
 
     Args:
         archive (EntryArchive): The archive containing the section that is being
@@ -394,3 +398,25 @@ Subclass of:
         logger (BoundLogger): A structlog logger.
     '''
     super().normalize(archive, logger)
+    if not self.data_file:
+      return
+
+    try:
+      with archive.m_context.raw_file(self.data_file, 'rb') as file:
+        cell = read_cif(file)
+    except ValueError as e:
+      logger.warning(f'Could not read the cell parameters from {self.data_file}: {e}')
+      return
+
+    self.latticeConstantA = LatticeConstantA(length=ureg.Quantity(cell.a, 'angstrom'))
+    self.latticeConstantB = LatticeConstantB(length=ureg.Quantity(cell.b, 'angstrom'))
+    self.latticeConstantC = LatticeConstantC(length=ureg.Quantity(cell.c, 'angstrom'))
+    self.latticeConstantAlpha = LatticeConstantAlpha(
+      angle=ureg.Quantity(cell.alpha, 'degree'))
+    self.latticeConstantBeta = LatticeConstantBeta(
+      angle=ureg.Quantity(cell.beta, 'degree'))
+    self.latticeConstantGamma = LatticeConstantGamma(
+      angle=ureg.Quantity(cell.gamma, 'degree'))
+    self.cellVolume = CellVolume(volume=ureg.Quantity(cell.volume, 'angstrom**3'))
+    if cell.space_group is not None:
+      self.spaceGroup = SpaceGroup(spaceGroup=cell.space_group)
@@ -10,14 +10,21 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
-from nomad.config import config
+import functools
+
 from nomad.datamodel.data import Schema
 from nomad.datamodel.metainfo.annotations import ELNAnnotation, ELNComponentEnum
 from nomad.metainfo import Quantity, SchemaPackage
 
-configuration = config.get_plugin_entry_point(
-    'cube.schema_packages:schema_package_entry_point'
-)
+
+@functools.cache
+def get_configuration():
+    # the plugin config is only looked up on first use, not at import time
+    from nomad.config import config  # noqa: PLC0415
+
+    return config.get_plugin_entry_point(
+        'cube.schema_packages:schema_package_entry_point'
+    )
 
 m_package = SchemaPackage()
 
@@ -31,7 +38,7 @@ class NewSchemaPackage(Schema):
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         super().normalize(archive, logger)
 
-        logger.info('NewSchema.normalize', parameter=configuration.parameter)
+        logger.info('NewSchema.normalize', parameter=get_configuration().parameter)
         self.message = f'Hello {self.name}!'
 
 
@@ -16,14 +16,18 @@
 # limitations under the License.
 #
 
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from typing import (
   TYPE_CHECKING,
 )
 
 import numpy as np
-import pandas as pd
-import plotly.express as px
-import yaml
 from nomad.datamodel.data import (
   ArchiveSection,
   EntryData,
@@ -38,6 +42,24 @@ from nomad.metainfo import (
 )
 from nomad.units import ureg
 
+from cube.analysis.campaign import (
+  OBJECTIVES,
+  best_so_far,
+  loop_objective,
+  stack_rows,
+)
+from cube.analysis.downsample import downsample_indices
+from cube.readers.resultsdb import DEFAULT_BATCH_SIZE, TableData, read_results_db
+from cube.readers.sidecar import load_cube_dat
+from cube.readers.yamlblocks import block_digest, load_yaml, split_blocks
+from cube.schema_packages import get_entry_point_setting
+from cube.schema_packages.cube import (
+  FIGURE_LABEL,
+  RawFileFingerprint,
+  replace_figure,
+  update_fingerprint,
+)
+
 if TYPE_CHECKING:
   from nomad.datamodel.datamodel import (
       EntryArchive,
@@ -48,6 +70,8 @@ if TYPE_CHECKING:
 
 m_package = Package(name='Schema for TMRB4Vex Simulation')
 
+ENTRY_POINT_ID = 'cube.schema_packages:tmr'
+
 
 class DatabaseConfig(ArchiveSection):
   m_def= Section(
@@ -220,6 +244,48 @@ class SimulationConfigSimulation(ArchiveSection):
   # hstart: float
   # hfinal: float
   # hstep: float
+  sim_name = Quantity(
+      type=str
+  )
+  iter = Quantity(
+      type=int
+  )
+  main_Mesh_min = Quantity(
+      type=np.float64
+  )
+  main_mesh_max = Quantity(
+      type=np.float64
+  )
+  object_Mesh_max = Quantity(
+      type=np.float64
+  )
+  xlen_start = Quantity(
+      type=np.float64
+  )
+  xlen_stop = Quantity(
+      type=np.float64
+  )
+  ylen_start = Quantity(
+      type=np.float64
+  )
+  ylen_stop = Quantity(
+      type=np.float64
+  )
+  zlen_start = Quantity(
+      type=np.float64
+  )
+  zlen_stop = Quantity(
+      type=np.float64
+  )
+  hstart = Quantity(
+      type=np.float64
+  )
+  hfinal = Quantity(
+      type=np.float64
+  )
+  hstep = Quantity(
+      type=np.float64
+  )
 
 class ServerConfig(ArchiveSection):
     # number_cores: int
@@ -234,6 +300,15 @@ class ServerConfig(ArchiveSection):
       ])
     )
   )
+  number_cores = Quantity(
+      type=int
+  )
+  mem_GB = Quantity(
+      type=int
+  )
+  gpu = Quantity(
+      type=str
+  )
 
 class GeneralSettingsConfig(ArchiveSection):
     # log_level: int
@@ -246,6 +321,12 @@ class GeneralSettingsConfig(ArchiveSection):
       ])
     )
   )
+  log_level = Quantity(
+      type=int
+  )
+  location = Quantity(
+      type=str
+  )
 
 class Optimizer(ArchiveSection):
     # acq_kind: str
@@ -281,6 +362,11 @@ class Optimizer(ArchiveSection):
   )
 
 
+# the blocks of a B4Vex configuration file, one subsection of `SimulationConfig`
+# each
+CONFIG_BLOCKS = ('database', 'shape', 'simulation', 'server', 'generalSettings',
+                 'optimizer')
+
 class SimulationConfig(ArchiveSection):
   m_def = Section()
   database = SubSection(
@@ -315,6 +401,271 @@ class SimulationConfig(ArchiveSection):
   # generalSettings: generalSettingsConfig
   # optimizer: Optimizer
 
+# number of distinct config blocks kept per worker process
+CONFIG_BLOCK_CACHE_SIZE = 1024
+_config_blocks: OrderedDict = OrderedDict()
+_config_blocks_lock = threading.Lock()
+
+def _set_from_dict(section: ArchiveSection, _dict: dict,
+                   errors: list = None) -> ArchiveSection:
+  for key, value in _dict.items():
+    try:
+      setattr(section, key, value)
+    except (TypeError, ValueError) as e:
+      # values that do not fit the type of their quantity are left out
+      if errors is not None:
+        errors.append(f'ignoring the value {value!r} of {key}: {e}')
+  return section
+
+def _log_config_errors(logger, name: str, errors) -> None:
+  if logger is not None:
+    for error in errors:
+      logger.warning(f'B4Vex config block {name}: {error}')
+
+def config_block(name: str, block_data: dict, errors: list = None) -> ArchiveSection:
+  '''
+  Creates the subsection `name` of `SimulationConfig` from the content of the
+  block with the same name in a B4Vex configuration file. Values that do not fit
+  their quantity are left out and described in `errors`.
+  '''
+  if name == 'shape':
+    shape = BoxConfig() if block_data['name'] == 'Box' else EllipseConfig()
+    shape.setFromDict(block_data)
+    return shape
+  section_def = SimulationConfig.m_def.all_sub_sections[name].sub_section
+  return _set_from_dict(section_def.section_cls(), block_data, errors)
+
+def cached_config_block(name: str, text: str, logger=None) -> ArchiveSection:
+  '''
+  Returns a copy of the subsection created from the YAML text of the block
+  `name`. Every distinct block is parsed and validated once per process, keyed by
+  the hash of its canonical text. The blocks have no subsections, so a shallow
+  copy suffices.
+  '''
+  key = (name, block_digest(text))
+  with _config_blocks_lock:
+    cached = _config_blocks.get(key)
+    if cached is not None:
+      _config_blocks.move_to_end(key)
+  if cached is None:
+    errors = []
+    cached = config_block(name, load_yaml(text)[name], errors), tuple(errors)
+    with _config_blocks_lock:
+      _config_blocks[key] = cached
+      while len(_config_blocks) > CONFIG_BLOCK_CACHE_SIZE:
+        _config_blocks.popitem(last=False)
+  prototype, errors = cached
+  _log_config_errors(logger, name, errors)
+  return prototype.m_copy()
+
+def config_from_text(text: str, logger=None) -> SimulationConfig:
+  '''
+  Creates the `SimulationConfig` from the text of a B4Vex configuration file.
+  The blocks are taken from the per-process block cache, documents that cannot be
+  split into blocks are parsed as a whole.
+  '''
+  blocks = split_blocks(text)
+  if blocks is None or not set(CONFIG_BLOCKS) <= blocks.keys():
+    return config_from_dict(load_yaml(text), logger)
+  config = SimulationConfig()
+  for name in CONFIG_BLOCKS:
+    setattr(config, name, cached_config_block(name, blocks[name], logger))
+  return config
+
+def read_config(archive: 'EntryArchive', path: str, logger=None) -> SimulationConfig:
+  '''
+  Reads the B4Vex configuration YAML file `path` into a `SimulationConfig`.
+  '''
+  with archive.m_context.raw_file(path) as file:
+    return config_from_text(file.read(), logger)
+
+def config_from_dict(config_data: dict, logger=None) -> SimulationConfig:
+  '''
+  Creates the `SimulationConfig` from the content of a B4Vex configuration file.
+  '''
+  config = SimulationConfig()
+  for name in CONFIG_BLOCKS:
+    errors = []
+    setattr(config, name, config_block(name, config_data[name], errors))
+    _log_config_errors(logger, name, errors)
+  return config
+
+class EvaluationColumn(ArchiveSection):
+  '''
+  One column of the results database, numeric columns in `values` and all other
+  columns in `text_values`.
+  '''
+  m_def = Section()
+  name = Quantity(
+    type=str,
+    description='The name of the column.',
+  )
+  values = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='The value of every row, NaN for NULL.',
+  )
+  text_values = Quantity(
+    type=str,
+    shape=['*'],
+    description='The value of every row as text.',
+  )
+
+def _as_text(values, text_values, n: int) -> list:
+  if text_values is not None:
+    return list(text_values)
+  if values is not None:
+    return [str(value) for value in values]
+  return [''] * n
+
+class EvaluationDatabase(ArchiveSection):
+  '''
+  The rows of the results database of the run (`DatabaseConfig.db_path`), with
+  one array per column. Later normalizations only import the rows added since
+  the last import.
+  '''
+  m_def = Section()
+  db_file = Quantity(
+    type=str,
+    description='The imported database file.',
+  )
+  table = Quantity(
+    type=str,
+    description='The imported table.',
+  )
+  n_rows = Quantity(
+    type=np.int64,
+    description='The number of imported rows.',
+  )
+  last_rowid = Quantity(
+    type=np.int64,
+    description='The largest imported rowid.',
+  )
+  rowids = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='The rowid of every imported row.',
+  )
+  columns = SubSection(
+    section_def=EvaluationColumn,
+    repeats=True,
+  )
+
+  def appendRows(self, data: TableData) -> None:
+    '''
+    Appends the rows read with `read_results_db`. If the rows were read from the
+    start of the table, the previous rows are replaced.
+    '''
+    n_previous = self.n_rows or 0
+    previous = {column.name: column for column in self.columns}
+    if data.after_rowid == 0 or self.table != data.table:
+      n_previous, previous = 0, {}
+      self.rowids = None
+
+    n_new = len(data.rowids)
+    columns = []
+    for name in dict.fromkeys(list(previous) + list(data.numeric) + list(data.text)):
+      column = previous.get(name)
+      if column is None:
+        column = EvaluationColumn(name=name)
+      if name in data.text or column.text_values is not None:
+        column.text_values = \
+          _as_text(column.values, column.text_values, n_previous) + \
+          _as_text(data.numeric.get(name), data.text.get(name), n_new)
+        column.values = None
+      else:
+        old = column.values if column.values is not None \
+          else np.full(n_previous, np.nan)
+        new = data.numeric.get(name, np.full(n_new, np.nan))
+        column.values = np.concatenate([old, new])
+      columns.append(column)
+
+    self.table = data.table
+    self.columns = columns
+    self.rowids = data.rowids if self.rowids is None \
+      else np.concatenate([self.rowids, data.rowids])
+    self.n_rows = len(self.rowids)
+    self.last_rowid = int(self.rowids[-1]) if self.n_rows else 0
+
+def database_file(archive: 'EntryArchive', config_file: str, db_path: str):
+  '''
+  Returns the upload path of the results database `db_path` of the configuration
+  `config_file`, or None if it is not in the upload. Relative paths are relative
+  to the configuration, absolute paths of the machine that ran the optimisation
+  are looked up by their basename next to the configuration.
+  '''
+  directory = os.path.dirname(config_file or '')
+  candidates = [os.path.basename(db_path)]
+  if not os.path.isabs(db_path):
+    candidates.insert(0, db_path)
+  for candidate in candidates:
+    path = os.path.normpath(os.path.join(directory, candidate))
+    try:
+      with archive.m_context.raw_file(path, 'rb'):
+        return path
+    except (KeyError, FileNotFoundError):
+      # uploads raise KeyError, local contexts FileNotFoundError
+      continue
+  return None
+
+@contextmanager
+def local_raw_file(archive: 'EntryArchive', path: str):
+  '''
+  Yields an OS path of the raw file `path`, e.g. for SQLite. Files of staging
+  uploads and of local contexts are used in place, other files (e.g. of published,
+  zipped uploads) are copied to a temporary file first.
+  '''
+  context = archive.m_context
+  upload_files = getattr(context, 'upload_files', None)
+  if hasattr(upload_files, 'raw_file_object'):
+    os_path = upload_files.raw_file_object(path).os_path
+  elif getattr(context, 'local_dir', None) is not None:
+    os_path = os.path.join(context.local_dir, path)
+  else:
+    os_path = None
+  if os_path is not None and os.path.isfile(os_path):
+    yield os_path
+    return
+
+  with tempfile.TemporaryDirectory() as directory:
+    copy = os.path.join(directory, os.path.basename(path))
+    with context.raw_file(path, 'rb') as source, open(copy, 'wb') as target:
+      shutil.copyfileobj(source, target)
+    yield copy
+
+def import_evaluations(section, archive: 'EntryArchive', logger: 'BoundLogger'):
+  '''
+  Imports the rows of the results database configured in `section.configuration`
+  into `section.evaluations`, only rows added since the last import.
+  '''
+  database = section.configuration.database if section.configuration else None
+  if database is None or not database.use_DB or not database.db_path:
+    return
+  db_file = database_file(archive, section.config_file, database.db_path)
+  if db_file is None:
+    logger.info(f'Results database {database.db_path} is not in the upload')
+    return
+
+  evaluations = section.evaluations
+  if evaluations is None or evaluations.db_file != db_file:
+    evaluations = EvaluationDatabase(db_file=db_file)
+  table = get_entry_point_setting(ENTRY_POINT_ID, 'database_table', None)
+  batch_size = get_entry_point_setting(ENTRY_POINT_ID, 'database_batch_size',
+                                       DEFAULT_BATCH_SIZE)
+  try:
+    with local_raw_file(archive, db_file) as os_path:
+      data = read_results_db(
+        os_path, table or evaluations.table,
+        after_rowid=evaluations.last_rowid or 0,
+        batch_size=batch_size,
+        preferred_tables=[database.name] if database.name else [])
+  except (sqlite3.Error, ValueError) as e:
+    logger.error(f'Could not import the results database {db_file}: {e}')
+    return
+  evaluations.appendRows(data)
+  section.evaluations = evaluations
+  logger.info(f'Imported {len(data.rowids)} rows from {db_file}')
+
 class Row(ArchiveSection):
   m_def = Section(
       a_eln={
@@ -327,6 +678,14 @@ class Row(ArchiveSection):
           }
       },)
 
+  time = Quantity(
+      type=np.int64,
+      description='Time step',
+  )
+  H_ex = Quantity(
+      type=np.float64,
+      description='External field',
+  )
   M = Quantity(
       type=np.float64,
       description='Magnetisation',
@@ -358,6 +717,23 @@ class B4VexSimulation(Simulation, PlotSection, EntryData, ArchiveSection):
   steps = SubSection(
     section_def=Row,
     repeats=True,
+    description='Per-step view of the result, only created for small files. '
+    'The array quantities `time`, `H_ex` and `M` hold the full data.',
+  )
+  time = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='Time step of every step in the result file.',
+  )
+  H_ex = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='External field of every step in the result file.',
+  )
+  M = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='Magnetisation of every step in the result file.',
   )
   result_file = Quantity(
     type=str,
@@ -373,6 +749,16 @@ class B4VexSimulation(Simulation, PlotSection, EntryData, ArchiveSection):
         "component": "FileEditQuantity",
     },
   )
+  evaluations = SubSection(
+    section_def=EvaluationDatabase,
+    repeats=False,
+  )
+  input_fingerprints = SubSection(
+    section_def=RawFileFingerprint,
+    repeats=True,
+    description='Fingerprints of the raw files read during normalization. '
+    'Normalization is skipped for files that did not change.',
+  )
 
   def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
     '''
@@ -384,69 +770,254 @@ class B4VexSimulation(Simulation, PlotSection, EntryData, ArchiveSection):
         logger (BoundLogger): A structlog logger.
     '''
     super().normalize(archive, logger)
+    result_changed = False
     if self.result_file:
-      self.readResult(archive)
+      with archive.m_context.raw_file(self.result_file, 'rb') as file:
+        unchanged, key = update_fingerprint(self, self.result_file, file)
+      if not unchanged or self.H_ex is None:
+        self.readResult(archive, key=key)
+        result_changed = True
     if self.config_file:
-      self.readConfig(archive)
-      logger.info("Reading configuration from file done")
-
-    self.createFigures()
-
-  def readConfig(self, archive: 'EntryArchive'):
-    with archive.m_context.raw_file(self.config_file) as file:
-      config_data = yaml.safe_load(file)
-      # print(config_data)
-      
-      config = SimulationConfig()
-      config.database = DatabaseConfig()
-      config.shape = BoxConfig() \
-                      if config_data['shape']['name'] == 'Box' else EllipseConfig()
-      config.simulation = SimulationConfigSimulation()
-      config.server = ServerConfig()
-      config.generalSettings = GeneralSettingsConfig()
-      config.optimizer = Optimizer()
-
-      for key in config_data['database']:
-        setattr(config.database, key, config_data['database'][key])
-      config.shape.setFromDict(config_data['shape'])
-      for key in config_data['simulation']:
-        setattr(config.simulation, key, config_data['simulation'][key])
-      for key in config_data['server']:
-        setattr(config.server, key, config_data['server'][key])
-      for key in config_data['generalSettings']:
-        setattr(config.generalSettings, key, config_data['generalSettings'][key])
-      for key in config_data['optimizer']:
-        setattr(config.optimizer, key, config_data['optimizer'][key])
-
-      self.configuration = config
-      # print(f"Config {config}")
-
-  def readResult(self, archive: 'EntryArchive'):
-    steps = []
-    with archive.m_context.raw_file(self.result_file) as file:
-      df = pd.read_csv(file, sep=' ', header=0, names=['time', 'H_ex', 'M'])
-    for i, row in df.iterrows():
-      step = Row()
-      step.time = row['time']
-      step.H_ex = row['H_ex']
-      step.M = row['M']
-      steps.append(step)
-    self.steps = steps
+      with archive.m_context.raw_file(self.config_file, 'rb') as file:
+        unchanged, _ = update_fingerprint(self, self.config_file, file)
+      if not unchanged or self.configuration is None:
+        self.readConfig(archive, logger)
+        logger.info("Reading configuration from file done")
+    import_evaluations(self, archive, logger)
+
+    if result_changed or not any(f.label == FIGURE_LABEL for f in self.figures):
+      self.createFigures()
+
+  def readConfig(self, archive: 'EntryArchive', logger=None):
+    self.configuration = read_config(archive, self.config_file, logger)
+    # print(f"Config {config}")
+
+  def readResult(self, archive: 'EntryArchive', key: str = None):
+    cache_dir = get_entry_point_setting(ENTRY_POINT_ID, 'sidecar_cache_dir', None)
+    with archive.m_context.raw_file(self.result_file, 'rb') as file:
+      self.time, self.H_ex, self.M = load_cube_dat(file, cache_dir, key=key)
+    self.createRowView()
+
+  def createRowView(self) -> None:
+    '''
+    Creates the per-step `Row` sections from the array quantities if the number
+    of steps does not exceed the configured `row_view_limit`.
+    '''
+    limit = get_entry_point_setting(ENTRY_POINT_ID, 'row_view_limit', 1000)
+    if len(self.H_ex) > limit:
+      self.steps = []
+      return
+    self.steps = [
+      Row(time=time, H_ex=H_ex, M=M)
+      for time, H_ex, M in zip(self.time.tolist(), self.H_ex.tolist(),
+                               self.M.tolist())
+    ]
 
   def createFigures(self) -> None:
-    if len(self.steps) == 0:
+    if self.H_ex is None or len(self.H_ex) == 0:
       return
-    x = [s.H_ex for s in self.steps]
-    y = [s.M for s in self.steps]
-    figure2 = px.scatter(x=x, y=y, 
+    # plotly.express is slow to import, so it is only loaded for figures
+    import plotly.express as px  # noqa: PLC0415
+
+    max_points = get_entry_point_setting(ENTRY_POINT_ID, 'max_plot_points', 10000)
+    shown = downsample_indices(self.H_ex, self.M, max_points)
+    figure2 = px.scatter(x=self.H_ex[shown], y=self.M[shown],
                           labels={
                             "x": "H_ex",
                             "y": "M"
                           },
                           title="Figure title")
-    self.figures.append(PlotlyFigure(label='figure 1', index=1, 
-                                      figure=figure2.to_plotly_json()))
+    replace_figure(self, PlotlyFigure(label=FIGURE_LABEL, index=1,
+                                       figure=figure2.to_plotly_json()))
+
+class B4VexCampaign(PlotSection, EntryData, ArchiveSection):
+  '''
+  All iterations of one B4Vex optimisation run in a single entry. The result files
+  of the iterations are stacked into (iteration x step) arrays, padded with NaN
+  (time with -1) to the longest result.
+  '''
+  m_def = Section()
+  configuration = SubSection(
+    section_def=SimulationConfig,
+    repeats = False,
+  )
+  config_file = Quantity(
+    type=str,
+    description='The configuration file for the simulation.',
+    a_eln={
+        "component": "FileEditQuantity",
+    },
+  )
+  result_files = Quantity(
+    type=str,
+    shape=['*'],
+    description='The result file of every iteration, in iteration order. Files '
+    'appended to the list are ingested by the next normalization.',
+  )
+  objective = Quantity(
+    type=str,
+    default='coercive_field',
+    description='The hysteresis value that is optimised, one of '
+    f'{", ".join(OBJECTIVES)}.',
+  )
+  maximize = Quantity(
+    type=bool,
+    default=True,
+    description='Whether larger values of the objective are better.',
+  )
+  n_steps = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='Number of steps in the result file of every iteration.',
+  )
+  time = Quantity(
+    type=np.int64,
+    shape=['*', '*'],
+    description='Time step of every iteration and step.',
+  )
+  H_ex = Quantity(
+    type=np.float64,
+    shape=['*', '*'],
+    description='External field of every iteration and step.',
+  )
+  M = Quantity(
+    type=np.float64,
+    shape=['*', '*'],
+    description='Magnetisation of every iteration and step.',
+  )
+  objective_values = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='The objective of every iteration.',
+  )
+  best_objective = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='The best objective found up to every iteration.',
+  )
+  best_iteration = Quantity(
+    type=np.int64,
+    description='The (0-based) iteration with the best objective.',
+  )
+  evaluated_objective = Quantity(
+    type=str,
+    description='The `objective` that `objective_values` were computed for.',
+  )
+  evaluated_maximize = Quantity(
+    type=bool,
+    description='The `maximize` setting that `best_objective` was computed for.',
+  )
+  evaluations = SubSection(
+    section_def=EvaluationDatabase,
+    repeats=False,
+  )
+  input_fingerprints = SubSection(
+    section_def=RawFileFingerprint,
+    repeats=True,
+    description='Fingerprints of the raw files read during normalization. '
+    'Result files that did not change are not read again.',
+  )
+
+  def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+    '''
+    The normalizer for the `B4VexCampaign` class. Only the result files that were
+    added since the last normalization are read, unless an ingested file changed.
+
+    Args:
+        archive (EntryArchive): The archive containing the section that is being
+        normalized.
+        logger (BoundLogger): A structlog logger.
+    '''
+    super().normalize(archive, logger)
+    if self.config_file:
+      with archive.m_context.raw_file(self.config_file, 'rb') as file:
+        unchanged, _ = update_fingerprint(self, self.config_file, file)
+      if not unchanged or self.configuration is None:
+        self.configuration = read_config(archive, self.config_file, logger)
+    import_evaluations(self, archive, logger)
+
+    added = self.readResults(archive, logger)
+    if added or not any(f.label == FIGURE_LABEL for f in self.figures):
+      self.createFigures()
+
+  def readResults(self, archive: 'EntryArchive', logger: 'BoundLogger') -> int:
+    '''
+    Appends the iterations that are not yet in the arrays and updates the
+    objective values. Returns the number of added iterations.
+    '''
+    files = list(self.result_files) if self.result_files is not None else []
+    cache_dir = get_entry_point_setting(ENTRY_POINT_ID, 'sidecar_cache_dir', None)
+    fingerprints = {f.path: f for f in self.input_fingerprints}
+    ingested = len(self.n_steps) if self.n_steps is not None else 0
+    if ingested > len(files):
+      ingested = 0
+    if (self.evaluated_objective, self.evaluated_maximize) != \
+        (self.objective, self.maximize):
+      ingested = 0
+
+    keys = []
+    for i, path in enumerate(files):
+      with archive.m_context.raw_file(path, 'rb') as file:
+        unchanged, key = update_fingerprint(self, path, file, fingerprints)
+      if i < ingested and not unchanged:
+        logger.info(f'Result file {path} changed, reading all iterations again')
+        ingested = 0
+      keys.append(key)
+
+    if ingested == 0:
+      self.n_steps = self.time = self.H_ex = self.M = None
+      self.objective_values = self.best_objective = self.best_iteration = None
+      self.evaluated_objective = self.objective
+      self.evaluated_maximize = self.maximize
+    new_files = files[ingested:]
+    if not new_files:
+      return 0
+
+    results = []
+    for path, key in zip(new_files, keys[ingested:]):
+      with archive.m_context.raw_file(path, 'rb') as file:
+        results.append(load_cube_dat(file, cache_dir, key=key))
+    objectives = np.array([
+      loop_objective(data.H_ex, data.M, self.objective) for data in results
+    ])
+
+    n_steps = np.array([len(data.H_ex) for data in results], dtype=np.int64)
+    if ingested:
+      n_steps = np.concatenate([self.n_steps, n_steps])
+    self.n_steps = n_steps
+    self.time = stack_rows(self.time, [d.time for d in results], -1, np.int64)
+    self.H_ex = stack_rows(self.H_ex, [d.H_ex for d in results], np.nan,
+                           np.float64)
+    self.M = stack_rows(self.M, [d.M for d in results], np.nan, np.float64)
+
+    previous_best = self.best_objective[-1] if ingested else np.nan
+    best = best_so_far(objectives, previous_best, self.maximize)
+    if ingested:
+      objectives = np.concatenate([self.objective_values, objectives])
+      best = np.concatenate([self.best_objective, best])
+    self.objective_values = objectives
+    self.best_objective = best
+    if not np.isnan(best[-1]):
+      self.best_iteration = int(np.flatnonzero(objectives == best[-1])[0])
+    logger.info(f'Added {len(new_files)} iterations, best objective {best[-1]}')
+    return len(new_files)
+
+  def createFigures(self) -> None:
+    if self.objective_values is None or len(self.objective_values) == 0:
+      return
+    import plotly.express as px  # noqa: PLC0415
 
+    iterations = np.arange(len(self.objective_values))
+    figure = px.scatter(x=iterations, y=self.objective_values,
+                        labels={
+                          "x": "iteration",
+                          "y": self.objective
+                        },
+                        title="Objective per iteration")
+    figure.add_scatter(x=iterations, y=self.best_objective, mode='lines',
+                       name='best so far')
+    replace_figure(self, PlotlyFigure(label=FIGURE_LABEL, index=1,
+                                      figure=figure.to_plotly_json()))
 
 m_package.__init_metainfo__()
 
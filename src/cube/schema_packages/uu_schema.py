@@ -1,7 +1,13 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from typing import (
   TYPE_CHECKING,
+  NamedTuple,
+  Optional,
 )
 
+import numpy as np
 from nomad.datamodel.data import (
   ArchiveSection,
   EntryData,
@@ -14,7 +20,28 @@ from nomad.metainfo import (
 )
 from nomad.units import ureg
 
-from .mammos_ontology import MagnetocrystallineAnisotropyConstantK1
+from cube.analysis.anisotropy import fit_anisotropy, parse_direction
+from cube.analysis.exchange import exchange_matrix, mean_field_curie_energy
+from cube.readers.mc import read_jfile, read_momfile, read_posfile
+from cube.readers.resultcache import (
+  DEFAULT_MAX_ENTRIES,
+  open_result_cache,
+  result_key,
+)
+from cube.readers.sidecar import file_digest, file_stat
+from cube.readers.uu import (
+  DIRECTION_OF_J,
+  EIGENVALUE_SUM,
+  TOTAL_MOMENT,
+  UNIT_CELL_VOLUME,
+  scan_first_values,
+  scan_last_values,
+  scan_last_values_reverse,
+  site_array,
+)
+
+from . import get_entry_point_setting
+from .mammos_ontology import CrystalStructure, MagnetocrystallineAnisotropyConstantK1
 
 if TYPE_CHECKING:
   from nomad.datamodel.datamodel import (
@@ -27,51 +54,207 @@ if TYPE_CHECKING:
 m_package = Package(name='Schema for UU data')
 m_package.__init_metainfo__()
 
-def compute_magnetization(tot_moments_D, dir_of_JD, lines):
+ENTRY_POINT_ID = 'cube.schema_packages:uu'
+
+# identifies the cached ground state values, bump it when their layout changes
+RESULT_CACHE_NAMESPACE = 'uu-ground-state-3'
+# the modules that derive the cached values, their source is part of the key
+RESULT_CACHE_MODULES = (
+  __name__,
+  'cube.analysis.anisotropy',
+  'cube.readers.uu',
+)
+
+# energy per cell in Ry divided by the cell volume in A^3, in J/m^3
+RY_PER_A3_IN_J_PER_M3 = 2179874 * 1e6
+
+# largest number of atoms for which the lattice-summed exchange is stored densely
+MAX_STORED_EXCHANGE_ATOMS = 500
+
+# number of threads that read raw files concurrently
+IO_WORKERS = 4
+
+def compute_magnetization(site_moments, site_directions, ucvA):
   """
   Calculating total magnetic moment by summing all
 
   (Total moment (of an orbital) * Direction of J 
   (takes the one with abs value > 0.9, should be +/-1))
+
+  :param site_moments: Array (sites x components) of the total moments, the
+    first component is the total moment J.
+  :param site_directions: Array (sites x 3) of the directions of J.
+  :param ucvA: The unit cell volume in cubic angstroms (A^3).
   """
   THRESH = 0.9
 
-  tot_magn_mom_C = 0
-  for key in tot_moments_D.keys():
-    tot_magn_mom_C += tot_moments_D[key][0] * \
-      [x for x in dir_of_JD[key] if abs(x) > THRESH][0]
-
-  # Getting unit cell volume in A^3 from the file
-  ucvA = get_unit_cell_volume(lines)
-  print(f'Unit cell volume: {ucvA} A\N{SUPERSCRIPT THREE}')
+  aligned = np.abs(site_directions) > THRESH
+  if not aligned.any(axis=1).all():
+    raise ValueError(f'Direction of J has no component above {THRESH}')
+  # the first component above the threshold of every site
+  sign = site_directions[np.arange(len(site_directions)), aligned.argmax(axis=1)]
+  tot_magn_mom_C = np.sum(site_moments[:, 0] * sign)
 
   # Calculating magnetization in Tesla
   magnetization_in_T = tot_magn_mom_C/ucvA*11.654
 
-  return magnetization_in_T, ucvA
+  return float(magnetization_in_T)
 
-def get_unit_cell_volume(lines):
+def get_unit_cell_volume(ucv):
     """
-    Extracts the unit cell volume from the given file.
-    :param file_name: The name of the file to extract the unit cell volume from.
+    Converts the unit cell volume found in the output file.
+    :param ucv: The last values of the 'unit cell volume:' label, as returned by
+      `scan_last_values`.
     :return: The unit cell volume in cubic angstroms (A^3).
     """
-    ucv = lastThingy(lines, 'unit cell volume:')
     ucvA = ucv[list(ucv.keys())[0]][0] / 1.8897259**3  # unit cell volume in A^3
     return ucvA
 
+def fit_anisotropy_constants(ucvA, energies):
+  """
+  Fits the anisotropy constants to the ground state energies of all magnetisation
+  directions.
+
+  :param ucvA: The unit cell volume in cubic angstroms (A^3).
+  :param energies: The eigenvalue sums in Ry per direction name, see
+    `parse_direction`.
+  :return: The directions and their unit vectors, the fitted terms, the
+    anisotropy constants in J/m^3, the fitted reference energy and the residuals
+    in Ry.
+  """
+  directions = [d for d in sorted(energies) if parse_direction(d) is not None]
+  vectors = np.array([parse_direction(d) for d in directions])
+  values = np.array([energies[d] for d in directions], dtype=np.float64)
+  fit = fit_anisotropy(vectors, values)
+  return dict(
+    directions=directions,
+    direction_vectors=vectors.tolist(),
+    energies=values.tolist(),
+    terms=list(fit.terms[1:]),
+    constants=(fit.coefficients[1:] / ucvA * RY_PER_A3_IN_J_PER_M3).tolist(),
+    reference_energy=float(fit.coefficients[0]),
+    residuals=fit.residuals.tolist(),
+  )
+
 def lastThingy(lines, valname,verbose=False):
-  last_lines_with_valname = {}
-  for line in lines:
-    if valname in line:
-      if verbose:
-          print(line)
-      pos = line.find(valname) + len(valname)
-      # TODO: check if part of the line can be converted to float; introduce
-      # boundaries in which the value should be
-      key, value = line.split()[0], [float(x) for x in line[pos:].split()]
-      last_lines_with_valname[key] = value
-  return last_lines_with_valname
+  # TODO: check if part of the line can be converted to float; introduce
+  # boundaries in which the value should be
+  return scan_last_values('\n'.join(lines), [valname])[valname]
+
+@functools.cache
+def io_executor() -> ThreadPoolExecutor:
+  """
+  Returns the bounded thread pool that is shared by all UU normalizers to read
+  raw files concurrently.
+  """
+  return ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='uu-io')
+
+@functools.cache
+def _open_result_cache(cache_dir, max_entries):
+  return open_result_cache(cache_dir, max_entries)
+
+def result_cache():
+  """
+  Returns the configured persistent cache of derived ground state values, or None
+  if it is disabled.
+  """
+  return _open_result_cache(
+    get_entry_point_setting(ENTRY_POINT_ID, 'result_cache_dir', None),
+    get_entry_point_setting(ENTRY_POINT_ID, 'result_cache_size',
+                            DEFAULT_MAX_ENTRIES))
+
+def raw_file_digest(archive, path):
+  with archive.m_context.raw_file(path, 'rb') as file:
+    return file_digest(file)[0]
+
+def raw_file_version(archive, path):
+  """
+  Returns the path, size and modification time of a raw file, or its content hash
+  if it has no modification time (e.g. in zipped uploads).
+  """
+  with archive.m_context.raw_file(path, 'rb') as file:
+    size, mtime = file_stat(file)
+    if mtime is None:
+      return file_digest(file)[0]
+  return f'{path}:{size}:{mtime}'
+
+def read_eigenvalue_sum(archive, path):
+  with archive.m_context.raw_file(path, 'rb') as file:
+    eigenvalue_sum = scan_last_values_reverse(file, [EIGENVALUE_SUM])[EIGENVALUE_SUM]
+  return eigenvalue_sum[list(eigenvalue_sum.keys())[0]][0]
+
+def read_out_last(archive, path):
+  # the unit cell volume is only printed in the header, the per-iteration values
+  # are read in a single backward pass over the tail of the file
+  with archive.m_context.raw_file(path, 'rb') as file:
+    values = scan_first_values(file, [UNIT_CELL_VOLUME])
+    values.update(scan_last_values_reverse(file, [TOTAL_MOMENT, DIRECTION_OF_J]))
+  return values
+
+class GroundStateValues(NamedTuple):
+  """
+  The values read by `read_ground_state`.
+
+  Attributes:
+    energies: The eigenvalue sum in Ry per direction name.
+    results: The cached values derived by `UUData.deriveResults`, or None.
+    result_key: The key under which the derived values are to be cached, None if
+      they were found in the cache or the cache is disabled.
+    digests: The content hashes of the files per role, to be cached with the
+      derived values.
+    out_last: The values of the `out_last` file as returned by `read_out_last`,
+      None if they were not read.
+  """
+  energies: dict
+  results: Optional[dict] = None
+  result_key: Optional[str] = None
+  digests: Optional[dict] = None
+  out_last: Optional[dict] = None
+
+def read_ground_state(archive, files, out_last_file=None):
+  """
+  Reads the eigenvalue sums of the direction files and the `out_last` file
+  concurrently. If the result cache holds the derived values for the sizes and
+  modification times of these files, and their content hashes match the cached
+  ones, the values are not read and the cached values are returned instead. The
+  files are only hashed if the cache is enabled.
+
+  :param files: The 'out_MF' file per direction name.
+  :param out_last_file: The 'out_last' file, or None to read the energies only.
+  """
+  executor = io_executor()
+  cache = result_cache() if out_last_file else None
+  key = digests = None
+  if cache is not None:
+    inputs = dict(files, out_last=out_last_file)
+    versions = dict(zip(inputs, executor.map(
+      raw_file_version, repeat(archive), inputs.values())))
+    key = result_key(RESULT_CACHE_NAMESPACE, versions, RESULT_CACHE_MODULES)
+    cached = cache.get(key)
+    # the content is only hashed to confirm a hit, since sizes and modification
+    # times can repeat, e.g. across uploads
+    digests = dict(zip(inputs, executor.map(
+      raw_file_digest, repeat(archive), inputs.values()))) if cached else None
+    if cached is not None and cached.get('digests') == digests:
+      return GroundStateValues(cached['energies'], results=cached)
+
+  futures = {
+    direction: executor.submit(read_eigenvalue_sum, archive, file)
+    for direction, file in files.items()
+  }
+  # out_last is read while the direction files are scanned
+  out_last = None
+  if out_last_file:
+    out_last = executor.submit(read_out_last, archive, out_last_file)
+  energies = {
+    direction: futures[direction].result() for direction in sorted(futures)
+  }
+  if key is not None and digests is None:
+    digests = dict(zip(inputs, executor.map(
+      raw_file_digest, repeat(archive), inputs.values())))
+  return GroundStateValues(
+    energies, result_key=key, digests=digests,
+    out_last=out_last.result() if out_last else None)
 
 class GroundState(ArchiveSection):
     m_def = Section()
@@ -96,6 +279,29 @@ class GroundState(ArchiveSection):
             'component': 'FileEditQuantity',
         },
     )
+    directions = Quantity(
+        type=str,
+        shape=['*'],
+        description='Magnetisation directions other than x, y and z, named like '
+        'their GS subdirectory, e.g. `1_1_0` or `theta45_phi0`.',
+    )
+    out_MF_files = Quantity(
+        type=str,
+        shape=['*'],
+        description="The 'out_MF_<direction>' file of every entry in `directions`.",
+    )
+
+    def directionFiles(self) -> dict:
+        """
+        Returns the 'out_MF' file per direction name for all directions.
+        """
+        files = {
+            direction: getattr(self, f'out_MF_{direction}')
+            for direction in ('x', 'y', 'z')
+        }
+        if self.directions is not None and self.out_MF_files is not None:
+            files.update(zip(self.directions, self.out_MF_files))
+        return {direction: file for direction, file in files.items() if file}
 
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         """
@@ -119,35 +325,199 @@ class GroundState(ArchiveSection):
             + f'MF_x: {self.out_MF_x} MY_y: {self.out_MF_y} MF_z: {self.out_MF_z}'
         )
         energies = {}
+        files = self.directionFiles()
 
-        if self.out_MF_z:
-            if self.out_MF_x is not None:
-                with archive.m_context.raw_file(self.out_MF_x) as file:
-                    lines = file.read().splitlines()
+        if len(files) > 1:
+            if isinstance(self.m_parent, UUData) and self.m_parent.out_last_file:
+                # the entry reads the direction files together with out_last
+                return
+            energies = read_ground_state(archive, files).energies
 
-                eigenvalue_sum = lastThingy(lines, 'Eigenvalue sum:')
-                energies['x'] = eigenvalue_sum[list(eigenvalue_sum.keys())[0]][0]
-            else:
-                self.out_MF_x = None
+        logger.info(f'Normalising groundstate energies: {energies}')
+        self.energies = energies
 
-            if self.out_MF_y is not None:
-                with archive.m_context.raw_file(self.out_MF_y) as file:
-                    lines = file.read().splitlines()
+class MonteCarloInput(ArchiveSection):
+  """
+  The inputs of the spin dynamics (Monte Carlo) calculation in the `MC` folder.
+  """
+  m_def = Section()
 
-                eigenvalue_sum = lastThingy(lines, 'Eigenvalue sum:')
-                energies['y'] = eigenvalue_sum[list(eigenvalue_sum.keys())[0]][0]
-            else:
-                self.out_MF_y = None
+  posfile = Quantity(
+    type=str,
+    description="The 'posfile' file.",
+    a_eln={
+        'component': 'FileEditQuantity',
+    },
+  )
+  momfile = Quantity(
+    type=str,
+    description="The 'momfile' file.",
+    a_eln={
+        'component': 'FileEditQuantity',
+    },
+  )
+  jfile = Quantity(
+    type=str,
+    description="The 'jfile' file.",
+    a_eln={
+        'component': 'FileEditQuantity',
+    },
+  )
 
-            if self.out_MF_z is not None:
-                with archive.m_context.raw_file(self.out_MF_z) as file:
-                    lines = file.read().splitlines()
+  atom_types = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='The type of every atom in the posfile.',
+  )
+  positions = Quantity(
+    type=np.float64,
+    shape=['*', 3],
+    description='The position of every atom in the posfile.',
+  )
+  moments = Quantity(
+    type=np.float64,
+    shape=['*'],
+    description='The magnitude of the moment of every atom in the momfile.',
+  )
+  moment_directions = Quantity(
+    type=np.float64,
+    shape=['*', 3],
+    description='The initial direction of the moment of every atom in the momfile.',
+  )
+  exchange_i = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='The first atom (1-based) of every exchange pair in the jfile.',
+  )
+  exchange_j = Quantity(
+    type=np.int64,
+    shape=['*'],
+    description='The second atom (1-based) of every exchange pair in the jfile.',
+  )
+  exchange_r = Quantity(
+    type=np.float64,
+    shape=['*', 3],
+    description='The vector from atom i to atom j of every exchange pair.',
+  )
+  exchange_J = Quantity(
+    type=np.float64,
+    shape=['*'],
+    unit='millirydberg',
+    description='The exchange coupling of every pair in the jfile.',
+  )
+  lattice_summed_exchange = Quantity(
+    type=np.float64,
+    shape=['*', '*'],
+    unit='millirydberg',
+    description='The exchange couplings between the atoms of the cell summed over '
+    'all lattice vectors, J0[i, j] = sum_R J_ij(R).',
+  )
 
-                eigenvalue_sum = lastThingy(lines, 'Eigenvalue sum:')
-                energies['z'] = eigenvalue_sum[list(eigenvalue_sum.keys())[0]][0]
+  def exchangeMatrix(self):
+    """
+    Returns the lattice-summed exchange matrix in mRy as sparse CSR matrix, or None
+    if no valid exchange pairs were read. The matrix is built once by `normalize`.
+    """
+    if not hasattr(self, '_exchange_matrix'):
+      self._exchange_matrix = self.buildExchangeMatrix()
+    return self._exchange_matrix
 
-        logger.info(f'Normalising groundstate energies: {energies}')
-        self.energies = energies
+  def buildExchangeMatrix(self, logger=None):
+    """
+    Builds the matrix returned by `exchangeMatrix`. Pairs with atom numbers that
+    are not in the posfile are logged as warning and give None.
+    """
+    if self.exchange_J is None or len(self.exchange_J) == 0:
+      return None
+    n_atoms = len(self.positions) if self.positions is not None else None
+    try:
+      return exchange_matrix(self.exchange_i, self.exchange_j,
+                             self.exchange_J.to('millirydberg').magnitude, n_atoms)
+    except ValueError as e:
+      if logger is not None:
+        logger.warning(f'Invalid exchange pairs in {self.jfile}: {e}')
+      return None
+
+  def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+    """
+    The normalizer for the `MonteCarloInput` class.
+
+    Args:
+        archive (EntryArchive): The archive containing the section that is being
+        normalized.
+        logger (BoundLogger): A structlog logger.
+    """
+    super().normalize(archive, logger)
+
+    if self.posfile:
+      with archive.m_context.raw_file(self.posfile) as file:
+        positions = read_posfile(file)
+      self.atom_types = positions.types
+      self.positions = positions.positions
+    if self.momfile:
+      with archive.m_context.raw_file(self.momfile) as file:
+        moments = read_momfile(file)
+      self.moments = moments.moments
+      self.moment_directions = moments.directions
+    if self.jfile:
+      with archive.m_context.raw_file(self.jfile) as file:
+        exchange = read_jfile(file)
+      self.exchange_i = exchange.i
+      self.exchange_j = exchange.j
+      self.exchange_r = exchange.r
+      self.exchange_J = ureg.Quantity(exchange.J, 'millirydberg')
+    # built once here, the entry reuses it for the Curie temperature
+    J0 = self._exchange_matrix = self.buildExchangeMatrix(logger)
+    # the dense matrix is only stored for cells of moderate size
+    if J0 is not None and J0.shape[0] <= MAX_STORED_EXCHANGE_ATOMS:
+      self.lattice_summed_exchange = ureg.Quantity(J0.toarray(), 'millirydberg')
+
+class AnisotropyConstants(ArchiveSection):
+  """
+  The anisotropy constants fitted by least squares to the ground state energies of
+  all magnetisation directions, see `cube.analysis.anisotropy`.
+  """
+  m_def = Section()
+
+  directions = Quantity(
+    type=str,
+    shape=['*'],
+    description='The magnetisation directions of the fit.',
+  )
+  direction_vectors = Quantity(
+    type=np.float64,
+    shape=['*', 3],
+    description='The unit vector of every direction.',
+  )
+  energies = Quantity(
+    type=np.float64,
+    shape=['*'],
+    unit='rydberg',
+    description='The eigenvalue sum of every direction.',
+  )
+  terms = Quantity(
+    type=str,
+    shape=['*'],
+    description='The fitted anisotropy terms, e.g. K1, K2, K3 and K1_in_plane. '
+    'Terms that the directions cannot distinguish are not fitted.',
+  )
+  constants = Quantity(
+    type=np.float64,
+    shape=['*'],
+    unit='J/m**3',
+    description='The fitted constant of every term.',
+  )
+  reference_energy = Quantity(
+    type=np.float64,
+    unit='rydberg',
+    description='The fitted energy for the magnetisation along the c-axis.',
+  )
+  residuals = Quantity(
+    type=np.float64,
+    shape=['*'],
+    unit='rydberg',
+    description='The energy minus the fitted model of every direction.',
+  )
 
 class UUData(EntryData, ArchiveSection):
   m_def = Section()
@@ -162,6 +532,21 @@ class UUData(EntryData, ArchiveSection):
     repeats = False,
   )
 
+  anisotropy = SubSection(
+    section_def=AnisotropyConstants,
+    repeats = False,
+  )
+
+  monteCarlo = SubSection(
+    section_def=MonteCarloInput,
+    repeats = False,
+  )
+
+  crystalStructure = SubSection(
+    section_def=CrystalStructure,
+    repeats = False,
+  )
+
   out_last_file = Quantity(
     type=str,
     description='The \'out_last\' file.',
@@ -170,6 +555,45 @@ class UUData(EntryData, ArchiveSection):
     },
   )
 
+  Ms = Quantity(
+    type=np.float64,
+    unit='tesla',
+    description='Spontaneous magnetisation computed from the total moments and '
+    'the directions of J of all sites.',
+  )
+
+  curie_temperature_mean_field = Quantity(
+    type=np.float64,
+    unit='kelvin',
+    description='Mean-field estimate of the Curie temperature from the largest '
+    'eigenvalue of the lattice-summed exchange matrix of the MC jfile.',
+  )
+
+  unit_cell_volume = Quantity(
+    type=np.float64,
+    unit='angstrom**3',
+    description='The unit cell volume from the \'out_last\' file.',
+  )
+
+  site_labels = Quantity(
+    type=str,
+    shape=['*'],
+    description='The inequivalent sites in the \'out_last\' file.',
+  )
+
+  site_moments = Quantity(
+    type=np.float64,
+    shape=['*', '*'],
+    description='The values of the \'Total moment [J=L+S] (mu_B):\' line per site, '
+    'the total moment J followed by its spin and orbital parts as printed.',
+  )
+
+  site_directions = Quantity(
+    type=np.float64,
+    shape=['*', 3],
+    description='The direction of J (Cartesian) per site.',
+  )
+
   def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
     '''
     The normalizer for the `UU data`.
@@ -181,45 +605,101 @@ class UUData(EntryData, ArchiveSection):
     '''
     super().normalize(archive, logger)
 
-    if self.out_last_file and self.groundState and self.groundState.energies != {}:
-      with archive.m_context.raw_file(self.out_last_file) as file:
-        lines = file.read().splitlines()
-
-      tot_moments_D = lastThingy(lines, 'Total moment [J=L+S] (mu_B):')
-      dir_of_JD = lastThingy(lines, 'Direction of J (Cartesian):')
-
-      magnetization_in_T, ucvA = compute_magnetization(tot_moments_D, dir_of_JD, 
-                                                       lines)
-      #print(f'Magnetization Ms: {magnetization_in_T} T')
-
-      K1_in_JPerCubibm = self.compute_anisotropy_constant(ucvA, 
-                                                          self.groundState.energies)
-      print('Anisotropy constant (max of all): ' +
+    files = self.groundState.directionFiles() if self.groundState else {}
+    if self.out_last_file and len(files) > 1:
+      values = read_ground_state(archive, files, self.out_last_file)
+      logger.info(f'Normalising groundstate energies: {values.energies}')
+      self.groundState.energies = values.energies
+      results = values.results
+      if results is not None:
+        logger.info('Using cached ground state values')
+      else:
+        results = self.deriveResults(archive, values.energies, values.out_last)
+        cache = result_cache() if values.result_key is not None else None
+        if cache is not None:
+          cache.put(values.result_key, dict(results, digests=values.digests))
+
+      self.site_labels = results['site_labels']
+      self.site_moments = np.array(results['site_moments'], dtype=np.float64)
+      self.site_directions = np.array(results['site_directions'], dtype=np.float64)
+      ucvA = results['unit_cell_volume']
+      print(f'Unit cell volume: {ucvA} A\N{SUPERSCRIPT THREE}')
+      self.unit_cell_volume = ureg.Quantity(ucvA, 'angstrom**3')
+      self.Ms = ureg.Quantity(results['Ms'], 'tesla')
+
+      fit = results['anisotropy']
+      if fit is None:
+        logger.error('The GS directions do not determine the anisotropy constants')
+      else:
+        self.setAnisotropy(fit)
+      K1_in_JPerCubibm = results['k1']
+      print('Anisotropy constant K1 (least squares): ' +
             f'{K1_in_JPerCubibm} J/m\N{SUPERSCRIPT THREE}')
-      logger.info('Anisotropy constant (max of all): ' +
+      logger.info('Anisotropy constant K1 (least squares): ' +
                   f'{K1_in_JPerCubibm} J/m\N{SUPERSCRIPT THREE}')
-      try:
+      if K1_in_JPerCubibm is not None:
         self.k1 = MagnetocrystallineAnisotropyConstantK1()
         self.k1.MagnetocrystallineAnisotropyConstantK1 = \
             ureg.Quantity(float(K1_in_JPerCubibm), 'J/m**3')
         print(f'K1 set to {self.k1.MagnetocrystallineAnisotropyConstantK1}')
-      except Exception as e:
-        print(e)
-        logger.error(f'Exception {e}')
-
-    print(f'K1 set to {self.k1.MagnetocrystallineAnisotropyConstantK1}')
-
-  def compute_anisotropy_constant(self, ucvA, energies):
-    print('Calculating anisotropy constant', ucvA, energies)
-    allKs = list()
-    if 'z' in energies.keys():
-        if 'x' in energies.keys():
-            Kxz = (energies['x'] - energies['z'])/ucvA*2179874
-            allKs.append(Kxz)
-        if 'y' in energies.keys():
-            Kyz = (energies['y'] - energies['z'])/ucvA*2179874
-            allKs.append(Kyz)
-
-    # anisotropy J/m³; MagnetocrystallineAnisotropyConstantK1
-    K1_in_JPerCubibm = max(allKs) * 1e6
-    return K1_in_JPerCubibm
+
+    if self.monteCarlo is not None:
+      J0 = self.monteCarlo.exchangeMatrix()
+      if J0 is not None:
+        kT_c = ureg.Quantity(mean_field_curie_energy(J0), 'millirydberg')
+        self.curie_temperature_mean_field = \
+            (kT_c / ureg.boltzmann_constant).to('kelvin')
+        logger.info(f'Mean-field Curie temperature {self.curie_temperature_mean_field}')
+
+    if self.k1 is not None:
+      print(f'K1 set to {self.k1.MagnetocrystallineAnisotropyConstantK1}')
+
+  def setAnisotropy(self, fit: dict) -> None:
+    """
+    Stores the result of `fit_anisotropy_constants` in the `anisotropy` section.
+    """
+    self.anisotropy = AnisotropyConstants(
+      directions=fit['directions'],
+      direction_vectors=np.array(fit['direction_vectors'], dtype=np.float64),
+      energies=ureg.Quantity(np.array(fit['energies']), 'rydberg'),
+      terms=fit['terms'],
+      constants=ureg.Quantity(np.array(fit['constants']), 'J/m**3'),
+      reference_energy=ureg.Quantity(fit['reference_energy'], 'rydberg'),
+      residuals=ureg.Quantity(np.array(fit['residuals']), 'rydberg'),
+    )
+
+  def deriveResults(self, archive: 'EntryArchive', energies,
+                    last_values=None) -> dict:
+    """
+    Derives the values that are stored in the result cache from the `out_last`
+    file: the ground state energies, the per-site arrays, the unit cell volume in
+    A^3, Ms in T, the anisotropy fit and K1 in J/m^3. The file is read unless its
+    values are given as `last_values`.
+    """
+    if last_values is None:
+      last_values = read_out_last(archive, self.out_last_file)
+    site_labels = list(last_values[TOTAL_MOMENT].keys())
+    site_moments = site_array(last_values[TOTAL_MOMENT], site_labels)
+    site_directions = site_array(last_values[DIRECTION_OF_J], site_labels)
+
+    # Getting unit cell volume in A^3 from the file
+    ucvA = get_unit_cell_volume(last_values[UNIT_CELL_VOLUME])
+
+    try:
+      anisotropy = fit_anisotropy_constants(ucvA, energies)
+    except ValueError:
+      anisotropy = None
+    k1 = None
+    if anisotropy is not None and 'K1' in anisotropy['terms']:
+      k1 = anisotropy['constants'][anisotropy['terms'].index('K1')]
+
+    return dict(
+      energies={direction: float(e) for direction, e in energies.items()},
+      site_labels=site_labels,
+      site_moments=site_moments.tolist(),
+      site_directions=site_directions.tolist(),
+      unit_cell_volume=float(ucvA),
+      Ms=compute_magnetization(site_moments, site_directions, ucvA),
+      anisotropy=anisotropy,
+      k1=k1,
+    )
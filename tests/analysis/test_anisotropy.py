@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from cube.analysis.anisotropy import fit_anisotropy, parse_direction
+
+
+def angle_scan(n_theta=7, n_phi=5):
+    theta, phi = np.meshgrid(np.linspace(0, np.pi / 2, n_theta),
+                             np.linspace(0, np.pi / 2, n_phi))
+    theta, phi = theta.ravel(), phi.ravel()
+    directions = np.stack([np.sin(theta) * np.cos(phi),
+                           np.sin(theta) * np.sin(phi),
+                           np.cos(theta)], axis=1)
+    return directions, theta, phi
+
+
+def test_fit_angle_scan():
+    directions, theta, phi = angle_scan()
+    sin2 = np.sin(theta) ** 2
+    energies = -10 + 2.0 * sin2 + 0.5 * sin2**2 + 0.1 * sin2**2 * np.cos(4 * phi)
+
+    fit = fit_anisotropy(directions, energies)
+
+    assert fit.terms == ('E0', 'K1', 'K2', 'K3', 'K1_in_plane')
+    np.testing.assert_allclose(fit.coefficients, [-10, 2.0, 0.5, 0.1, 0],
+                               atol=1e-10)
+    np.testing.assert_allclose(fit.residuals, 0, atol=1e-10)
+
+
+def test_fit_batched():
+    directions, theta, _ = angle_scan()
+    K1 = np.array([1.0, 2.0, 3.0])
+    energies = np.outer(np.sin(theta) ** 2, K1)
+    energies[0] += 1e-3
+
+    fit = fit_anisotropy(directions, energies)
+
+    assert fit.coefficients.shape == (5, 3)
+    assert fit.residuals.shape == (len(directions), 3)
+    np.testing.assert_allclose(fit.coefficients[1], K1, atol=1e-3)
+    assert np.abs(fit.residuals[0]).max() > 0
+
+
+def test_fit_principal_axes():
+    directions = np.array([parse_direction(d) for d in 'xyz'])
+
+    fit = fit_anisotropy(directions, [1.0, 3.0, 0.0])
+
+    assert fit.terms == ('E0', 'K1', 'K1_in_plane')
+    np.testing.assert_allclose(fit.coefficients, [0.0, 2.0, -1.0], atol=1e-12)
+
+    with pytest.raises(ValueError):
+        fit_anisotropy(directions[:1], [1.0])
+
+
+def test_parse_direction():
+    np.testing.assert_allclose(parse_direction('1_1_0'),
+                               [2**-0.5, 2**-0.5, 0])
+    np.testing.assert_allclose(parse_direction('theta90_phi90'), [0, 1, 0],
+                               atol=1e-12)
+    assert parse_direction('Jij') is None
+    assert parse_direction('0_0_0') is None
@@ -0,0 +1,29 @@
+import numpy as np
+
+from cube.analysis.campaign import best_so_far, loop_objective, stack_rows
+
+
+def test_stack_rows():
+    stacked = stack_rows(None, [np.arange(3.0), np.arange(2.0)], np.nan, np.float64)
+    stacked = stack_rows(stacked, [np.arange(4.0)], np.nan, np.float64)
+
+    assert stacked.shape == (3, 4)
+    assert np.isnan(stacked[0, 3]) and np.isnan(stacked[1, 2])
+    assert stacked[2].tolist() == [0, 1, 2, 3]
+
+
+def test_best_so_far():
+    best = best_so_far([1.0, np.nan, 0.5, 2.0])
+    assert best.tolist() == [1.0, 1.0, 1.0, 2.0]
+
+    assert best_so_far([3.0, 0.5], previous_best=1.0, maximize=False).tolist() == [
+        1.0, 0.5]
+
+
+def test_loop_objective():
+    H = np.array([1.0, 0.0, -1.0, 0.0, 1.0])
+    M = np.array([1.0, 0.5, -1.0, -0.5, 1.0])
+
+    assert loop_objective(H, M, 'saturation_magnetisation') == 1.0
+    np.testing.assert_allclose(loop_objective(H, M, 'coercive_field'), 1 / 3)
+    assert np.isnan(loop_objective(H[:1], M[:1], 'coercive_field'))
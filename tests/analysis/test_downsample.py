@@ -0,0 +1,32 @@
+import numpy as np
+
+from cube.analysis.downsample import downsample_indices
+
+
+def test_downsample_keeps_loop_features():
+    t = np.linspace(0, 2 * np.pi, 100001)
+    H_ex = np.cos(t)
+    M = np.tanh(20 * (H_ex + 0.3 * np.sign(np.sin(t))))
+
+    shown = downsample_indices(H_ex, M, 500)
+
+    assert len(shown) <= 500  # noqa: PLR2004
+    assert shown[0] == 0 and shown[-1] == len(t) - 1
+    # the points around the switching events and the remanence are kept
+    for values in (H_ex, M):
+        crossings = np.flatnonzero(np.diff(np.signbit(values)))
+        assert np.isin(crossings, shown).all()
+    assert M[shown].max() == M.max() and M[shown].min() == M.min()
+
+
+def test_downsample_small_curve():
+    indices = downsample_indices(np.arange(5), np.arange(5), 10)
+    assert indices.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_small_cap():
+    t = np.linspace(0, 2 * np.pi, 1001)
+    for max_points in range(2, 7):
+        shown = downsample_indices(np.cos(t), np.sin(t), max_points)
+        assert len(shown) == max_points
+        assert shown[0] == 0 and shown[-1] == len(t) - 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from cube.analysis.exchange import (
+    exchange_matrix,
+    largest_eigenvalue,
+    mean_field_curie_energy,
+)
+
+
+def test_exchange_matrix_sums_lattice_vectors():
+    J0 = exchange_matrix([1, 1, 2, 1], [2, 2, 1, 1], [1.0, 0.5, 1.5, 0.2])
+
+    assert J0.format == 'csr'
+    assert J0.toarray().tolist() == [[0.2, 1.5], [1.5, 0.0]]
+
+
+def test_exchange_matrix_atom_out_of_range():
+    with pytest.raises(ValueError, match='atoms 1 and 3'):
+        exchange_matrix([1, 1], [2, 3], [1.0, 0.5], n_atoms=2)
+    with pytest.raises(ValueError):
+        exchange_matrix([0], [1], [1.0], n_atoms=2)
+
+
+def test_largest_eigenvalue_sparse():
+    rng = np.random.default_rng(0)
+    n_atoms = 200
+    i, j = rng.integers(1, n_atoms + 1, (2, 5000))
+    J0 = exchange_matrix(i, j, rng.random(5000), n_atoms)
+
+    dense = np.linalg.eigvalsh(0.5 * (J0 + J0.T).toarray())[-1]
+    np.testing.assert_allclose(largest_eigenvalue(J0), dense)
+    np.testing.assert_allclose(mean_field_curie_energy(J0), 2 / 3 * dense)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from cube.analysis.hysteresis import analyse_loop, branch_starts, zero_crossings
+
+
+def test_analyse_square_loop():
+    down = np.linspace(1, -1, 1001)
+    up = down[::-1][1:]
+    H_ex = np.concatenate([down, up])
+    M = np.concatenate([np.tanh(20 * (down + 0.3)), np.tanh(20 * (up - 0.3))])
+
+    summary = analyse_loop(H_ex, M)
+
+    assert summary.n_branches == 2  # noqa: PLR2004
+    np.testing.assert_allclose(summary.coercive_fields, [-0.3, 0.3], atol=1e-6)
+    np.testing.assert_allclose(summary.remanent_magnetisations, [1, -1], atol=1e-4)
+    np.testing.assert_allclose(summary.switching_fields, [-0.3, 0.3], atol=2e-3)
+    assert summary.saturation_magnetisation == M.max()
+    # close to the area of the ideal square loop of width 0.6 and height 2
+    np.testing.assert_allclose(summary.loop_area, 1.2, rtol=1e-3)
+
+
+def test_zero_crossings_signed_zero():
+    x = np.array([0.0, 1.0, 2.0, 3.0])
+    y = np.array([1.0, 0.0, -0.0, -1.0])
+
+    with np.errstate(divide='raise', invalid='raise'):
+        crossings = zero_crossings(x, y)
+    assert np.isfinite(crossings).all()
+    assert zero_crossings(x, np.array([0.0, -0.0, 0.0, -0.0])).size == 0
+
+
+def test_branch_starts_leading_constant_field():
+    H = np.array([1.0, 1.0, 1.0, 0.5, 0.0, 0.5, 1.0])
+    assert branch_starts(H).tolist() == [0, 4]
+    assert branch_starts(np.ones(4)).tolist() == [0]
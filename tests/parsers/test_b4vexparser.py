@@ -0,0 +1,74 @@
+import logging
+
+from nomad.client import normalize_all, parse
+from nomad.datamodel import EntryArchive
+
+from cube.parsers.b4vexparser import B4VexParser, iteration_order
+from cube.parsers.cubeparser import CubeParser
+from cube.schema_packages.tmrshape import B4VexCampaign, B4VexSimulation
+
+
+def read_buffer(path):
+    with open(path, 'rb') as file:
+        buffer = file.read(1024)
+    return buffer, buffer.decode()
+
+
+def test_is_mainfile():
+    parser = B4VexParser(mainfile_name_re=r'.*\.ya?ml$')
+
+    buffer, decoded_buffer = read_buffer('tests/data/b4vex/config.yaml')
+    assert parser.is_mainfile('run/config.yaml', 'text/plain', buffer,
+                              decoded_buffer)
+    buffer, decoded_buffer = read_buffer('tests/data/test_b4vex.archive.yaml')
+    assert not parser.is_mainfile('test_b4vex.archive.yaml', 'text/plain', buffer,
+                                  decoded_buffer)
+
+
+def test_result_files_are_not_cube_entries():
+    parser = CubeParser(mainfile_name_re=r'.*\.dat$')
+    for path in ('tests/data/b4vex/iteration_0.dat', 'tests/data/b4vex_run/result.dat'):
+        buffer, decoded_buffer = read_buffer(path)
+        assert not parser.is_mainfile(path, 'text/plain', buffer, decoded_buffer)
+
+    buffer, decoded_buffer = read_buffer('tests/data/cube.dat')
+    assert parser.is_mainfile('tests/data/cube.dat', 'text/plain', buffer,
+                              decoded_buffer)
+
+    parser = CubeParser(mainfile_name_re=r'.*\.dat$', exclude_name_re=None)
+    buffer, decoded_buffer = read_buffer('tests/data/b4vex_run/result.dat')
+    assert parser.is_mainfile('tests/data/b4vex_run/result.dat', 'text/plain',
+                              buffer, decoded_buffer)
+
+
+def test_parse_simulation():
+    parser = B4VexParser()
+    archive = EntryArchive()
+    parser.parse('tests/data/b4vex_run/config.yaml', archive, logging.getLogger())
+
+    data = archive.data
+    assert isinstance(data, B4VexSimulation)
+    assert data.result_file == 'result.dat'
+    assert data.M.shape == (80,)
+    assert data.configuration.shape.init_r1.to('nm').magnitude == 10.0  # noqa: PLR2004
+    assert data.configuration.optimizer.acq_kind == 'ucb'
+    assert len(data.input_fingerprints) == 2  # noqa: PLR2004
+
+
+def test_parse_campaign():
+    entry_archive = parse('tests/data/b4vex/config.yaml')[0]
+
+    data = entry_archive.data
+    assert isinstance(data, B4VexCampaign)
+    assert list(data.result_files) == [
+        'iteration_0.dat', 'iteration_1.dat', 'iteration_2.dat']
+    assert data.configuration.database.db_path == 'results.db'
+
+    normalize_all(entry_archive)
+    assert data.H_ex.shape == (3, 80)
+
+
+def test_iteration_order():
+    names = ['run_10.dat', 'run_9.dat', 'run_1.dat']
+    assert sorted(names, key=iteration_order) == [
+        'run_1.dat', 'run_9.dat', 'run_10.dat']
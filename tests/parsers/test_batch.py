@@ -0,0 +1,25 @@
+import json
+import os
+import shutil
+
+from cube.parsers.batch import find_cube_files, parse_batch
+
+
+def test_parse_batch(tmp_path):
+    for name in ('a/run_1.dat', 'a/b/run_2.dat', 'run_3.dat'):
+        os.makedirs(os.path.dirname(tmp_path / name), exist_ok=True)
+        shutil.copy('tests/data/cube.dat', tmp_path / name)
+    (tmp_path / 'notes.dat').write_text('not a cube file\n')
+
+    assert len(find_cube_files(str(tmp_path))) == 3  # noqa: PLR2004
+    assert find_cube_files(str(tmp_path), mainfile_name_re=r'run_3\.dat') == [
+        str(tmp_path / 'run_3.dat')]
+
+    archives = parse_batch(str(tmp_path), str(tmp_path / 'out'), workers=2)
+    assert len(archives) == 3  # noqa: PLR2004
+    target = archives[str(tmp_path / 'a' / 'b' / 'run_2.dat')]
+    assert target == str(tmp_path / 'out' / 'a' / 'b' / 'run_2.dat.archive.json')
+    with open(target) as file:
+        archive = json.load(file)
+    assert archive['data']['data_file'] == os.path.join('a', 'b', 'run_2.dat')
+    assert 'summary' in archive['data']
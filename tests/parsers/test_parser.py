@@ -3,6 +3,7 @@ import logging
 from nomad.datamodel import EntryArchive
 
 from cube.parsers.cubeparser import CubeParser
+from cube.parsers.dirindex import upload_path, upload_root
 from cube.schema_packages.cube import Cube
 
 
@@ -12,3 +13,31 @@ def test_parse_file():
     parser.parse('tests/data/cube.dat', archive, logging.getLogger())
 
     assert isinstance(archive.data,Cube)
+
+
+def test_is_mainfile():
+    parser = CubeParser(mainfile_name_re=r'.*\.dat$')
+    with open('tests/data/cube.dat', 'rb') as file:
+        buffer = file.read(1024)
+
+    assert parser.is_mainfile('sweep/run_1.dat', 'text/plain', buffer,
+                              buffer.decode())
+    other = b'# some other data file\nfoo bar baz\n1 2 3\n'
+    assert not parser.is_mainfile('cube.dat', 'text/plain', other, other.decode())
+
+
+def test_parse_reads_data():
+    parser = CubeParser()
+    archive = EntryArchive()
+    parser.parse('tests/data/cube.dat', archive, logging.getLogger())
+
+    assert archive.data.data_file == 'cube.dat'
+    assert archive.data.M.shape == (80,)
+    assert archive.data.input_fingerprints[0].size == 3474  # noqa: PLR2004
+
+
+def test_upload_path():
+    mainfile = '/uploads/ab/raw/sweep_draw/run/cube.dat'
+    assert upload_path(mainfile) == 'sweep_draw/run/cube.dat'
+    assert upload_root(mainfile) == '/uploads/ab/raw'
+    assert upload_path('/data/sweep_draw/cube.dat') == 'cube.dat'
@@ -0,0 +1,109 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from nomad.datamodel import EntryArchive
+
+from cube.parsers import dirindex
+from cube.parsers.dirindex import directory_index
+from cube.parsers.uuparser import UUParser
+
+
+def test_directory_index():
+    index = directory_index('tests/data/uu/structure.cif')
+
+    assert index.isdir('tests/data/uu/GS/x')
+    assert index.isfile('tests/data/uu/MC/jfile')
+    assert not index.isfile('tests/data/uu/GS')
+    assert index.listdir('tests/data/uu/GS') == ['x', 'z']
+    assert directory_index('tests/data/uu/README') is index
+
+
+def test_directory_index_checks_directories_once_per_pass(tmp_path, monkeypatch):
+    shutil.copytree('tests/data/uu', tmp_path / 'uu')
+    mainfile = str(tmp_path / 'uu' / 'structure.cif')
+    parser = UUParser()
+    assert parser.is_mainfile(mainfile, 'text/plain', b'', '')
+
+    stats = []
+
+    def stat(path, *args, **kwargs):
+        stats.append(path)
+        return original(path, *args, **kwargs)
+
+    original = os.stat
+    monkeypatch.setattr(dirindex.os, 'stat', stat)
+    for _ in range(10):
+        assert parser.is_mainfile(mainfile, 'text/plain', b'', '')
+    assert stats == []
+
+    directory_index(mainfile).start_pass()
+    for _ in range(10):
+        assert parser.is_mainfile(mainfile, 'text/plain', b'', '')
+    assert len(stats) == len(set(stats))
+
+
+def test_directory_index_follows_changes(tmp_path):
+    shutil.copytree('tests/data/uu', tmp_path / 'uu')
+    (tmp_path / 'uu' / 'GS' / 'z' / 'out_last').unlink()
+    (tmp_path / 'uu' / 'notes').mkdir()
+    mainfile = str(tmp_path / 'uu' / 'structure.cif')
+    parser = UUParser()
+    assert not parser.is_mainfile(mainfile, 'text/plain', b'', '')
+
+    (tmp_path / 'uu' / 'GS' / 'z' / 'out_last').write_text('')
+    (tmp_path / 'uu' / 'GS' / 'y').mkdir()
+    (tmp_path / 'uu' / 'notes').rmdir()
+    index = directory_index(mainfile)
+    # e.g. the upload is processed again
+    index.start_pass()
+    assert parser.is_mainfile(mainfile, 'text/plain', b'', '')
+    assert index.listdir(str(tmp_path / 'uu' / 'GS')) == ['x', 'y', 'z']
+    assert not index.isdir(str(tmp_path / 'uu' / 'notes'))
+    assert index.listdir(str(tmp_path / 'uu' / 'notes')) == []
+
+
+def test_is_mainfile():
+    parser = UUParser()
+
+    assert parser.is_mainfile('tests/data/uu/structure.cif', 'text/plain', b'', '')
+    assert not parser.is_mainfile('tests/data/cube.dat', 'text/plain', b'', '')
+
+
+def test_check_files_present():
+    parser = UUParser()
+    index = directory_index('tests/data/uu/structure.cif')
+
+    present = parser.checkFilesPresent('tests/data/uu', index)
+    assert present.ok
+    assert present.optional_subfolders == [False]
+
+    present = parser.checkFilesPresent('tests/data', index, check_README=True)
+    assert not present.ok
+    assert not present.mom_j_pos_files
+
+
+def test_is_mainfile_concurrent():
+    parser = UUParser()
+    candidates = ['tests/data/uu/structure.cif', 'tests/data/structure.cif'] * 50
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda filename: parser.is_mainfile(filename, 'text/plain', b'', ''),
+            candidates))
+
+    assert results == [True, False] * 50
+
+
+def test_parse_out_last_of_checked_direction(tmp_path):
+    shutil.copytree('tests/data/uu', tmp_path / 'uu')
+    (tmp_path / 'uu' / 'GS' / 'theta45_phi0').mkdir()
+    shutil.copy('tests/data/uu/GS/x/out_MF_x',
+                tmp_path / 'uu' / 'GS' / 'theta45_phi0' / 'out_MF_theta45_phi0')
+    archive = EntryArchive()
+    UUParser().parse(str(tmp_path / 'uu' / 'structure.cif'), archive,
+                     logging.getLogger())
+
+    assert archive.data.out_last_file.endswith('/GS/x/out_last')
+    assert list(archive.data.groundState.directions) == ['theta45_phi0']
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from cube.readers.cif import cell_volume, parse_cif, read_cif
+
+
+def test_read_cif():
+    with open('tests/data/uu/structure.cif', 'rb') as file:
+        cell = read_cif(file)
+
+    assert (cell.a, cell.b, cell.c) == (3.86, 3.86, 3.71)
+    assert cell.space_group == 'P 4/m m m'
+    np.testing.assert_allclose(cell.volume, 3.86 * 3.86 * 3.71)
+
+    with open('tests/data/uu/structure.cif', 'rb') as file:
+        assert read_cif(file) is cell
+
+
+def test_cell_volume_vectorised():
+    volumes = cell_volume([[1, 2]] * 3, [[90, 60]] * 3)
+
+    np.testing.assert_allclose(volumes, [1, 8 / np.sqrt(2)])
+
+
+def test_parse_cif_quoted_values():
+    cell = parse_cif(
+        "data_x\n_cell_length_a 5.1(2)\n_cell_length_b 5.1\n_cell_length_c 7\n"
+        "_cell_angle_alpha 90\n_cell_angle_beta 90\n_cell_angle_gamma 120\n"
+        "_space_group_name_H-M_alt 'P 63/m m c'\n"
+    )
+    assert cell.a == 5.1  # noqa: PLR2004
+    assert cell.space_group == 'P 63/m m c'
+
+
+@pytest.mark.parametrize(
+    'gamma, message',
+    [('?', 'without cell parameters gamma'), ('abc', 'invalid cell parameter gamma')],
+)
+def test_parse_cif_invalid_cell(gamma, message):
+    text = (
+        'data_x\n_cell_length_a 5\n_cell_length_b 5\n_cell_length_c 7\n'
+        f'_cell_angle_alpha 90\n_cell_angle_beta 90\n_cell_angle_gamma {gamma}\n'
+    )
+    with pytest.raises(ValueError, match=message):
+        parse_cif(text)
+
+
+def test_parse_cif_unknown_space_group():
+    cell = parse_cif(
+        'data_x\n_cell_length_a 5\n_cell_length_b 5\n_cell_length_c 7\n'
+        '_cell_angle_alpha 90\n_cell_angle_beta 90\n_cell_angle_gamma 90\n'
+        "_symmetry_space_group_name_H-M '?'\n"
+    )
+    assert cell.space_group is None
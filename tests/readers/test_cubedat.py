@@ -0,0 +1,37 @@
+import io
+
+import numpy as np
+
+from cube.readers.cubedat import read_cube_dat
+from cube.readers.sidecar import load_cube_dat
+
+
+def test_read_cube_dat_chunks():
+    with open('tests/data/cube.dat', 'rb') as file:
+        data = read_cube_dat(file)
+    assert len(data) == 80  # noqa: PLR2004
+    assert data.time.dtype == np.int64
+
+    for chunk_size in (7, 64):
+        with open('tests/data/cube.dat', 'rb') as file:
+            chunked = read_cube_dat(file, chunk_size=chunk_size)
+        assert np.array_equal(chunked.H_ex, data.H_ex)
+        assert np.array_equal(chunked.M, data.M)
+
+
+def test_read_cube_dat_mixed_whitespace():
+    data = read_cube_dat(io.BytesIO(b'header\n0001\t1.0  2.5\n0000   0.5\t\t-2.5'))
+    assert data.time.tolist() == [1, 0]
+    assert data.H_ex.tolist() == [1.0, 0.5]
+    assert data.M.tolist() == [2.5, -2.5]
+
+
+def test_sidecar_cache(tmp_path):
+    with open('tests/data/cube.dat', 'rb') as file:
+        parsed = load_cube_dat(file, str(tmp_path))
+    with open('tests/data/cube.dat', 'rb') as file:
+        cached = load_cube_dat(file, str(tmp_path))
+
+    assert isinstance(cached.M, np.memmap)
+    assert np.array_equal(cached.M, parsed.M)
+    assert np.array_equal(cached.time, parsed.time)
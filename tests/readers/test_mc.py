@@ -0,0 +1,26 @@
+import io
+
+from cube.readers.mc import read_jfile, read_momfile, read_posfile
+
+
+def test_read_mc_files():
+    with open('tests/data/uu/MC/posfile') as file:
+        positions = read_posfile(file)
+    with open('tests/data/uu/MC/momfile') as file:
+        moments = read_momfile(file)
+    with open('tests/data/uu/MC/jfile') as file:
+        exchange = read_jfile(file)
+
+    assert positions.positions.shape == (3, 3)
+    assert positions.types.tolist() == [1, 1, 2]
+    assert moments.moments.tolist() == [2.2, 2.2, 0.35]
+    assert len(exchange) == 12  # noqa: PLR2004
+    assert exchange.r.shape == (12, 3)
+    assert exchange.i[0] == 1 and exchange.j[0] == 2  # noqa: PLR2004
+
+
+def test_read_posfile_without_atom_numbers():
+    positions = read_posfile(io.StringIO('# type x y z\n1 0 0 0\n2 0.5 0.5 0.5\n'))
+
+    assert positions.atoms.tolist() == [1, 2]
+    assert positions.positions[1].tolist() == [0.5, 0.5, 0.5]
@@ -0,0 +1,35 @@
+from cube.readers.resultcache import ResultCache, open_result_cache, result_key
+
+
+def test_result_cache_lru(tmp_path):
+    cache = ResultCache(str(tmp_path), max_entries=2)
+    cache.put('a', {'k1': 1.0})
+    cache.put('b', {'k1': 2.0})
+    assert cache.get('a') == {'k1': 1.0}
+
+    # 'b' is the least recently used entry
+    cache.put('c', {'k1': 3.0})
+    assert len(cache) == 2  # noqa: PLR2004
+    assert cache.get('b') is None
+    assert cache.get('a') == {'k1': 1.0}
+    assert ResultCache(str(tmp_path)).get('c') == {'k1': 3.0}
+
+
+def test_result_key():
+    key = result_key('test', {'x': '00', 'z': '11'})
+    assert key == result_key('test', {'z': '11', 'x': '00'})
+    assert key != result_key('test', {'x': '11', 'z': '00'})
+    assert key != result_key('other', {'x': '00', 'z': '11'})
+
+
+def test_result_key_code_version():
+    key = result_key('test', {'x': '00'})
+    assert key == result_key('test', {'x': '00'}, ())
+    assert key != result_key('test', {'x': '00'}, ('cube.readers.uu',))
+    assert result_key('test', {'x': '00'}, ('cube.readers.uu',)) != \
+        result_key('test', {'x': '00'}, ('cube.readers.cif',))
+
+
+def test_disabled_result_cache():
+    assert open_result_cache('') is None
+    assert open_result_cache(None) is None
@@ -0,0 +1,47 @@
+import sqlite3
+
+import numpy as np
+
+from cube.readers.resultsdb import read_results_db
+
+
+def create_db(path, n_rows):
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS evaluations '
+            '(xlen REAL, objective REAL, status TEXT, note)')
+        connection.executemany(
+            'INSERT INTO evaluations VALUES (?, ?, ?, ?)',
+            [(float(i), None if i == 1 else i * 0.5, 'done', i)
+             for i in range(n_rows)])
+    connection.close()
+
+
+def test_read_results_db(tmp_path):
+    path = str(tmp_path / 'results.db')
+    create_db(path, 25)
+
+    data = read_results_db(path, batch_size=10)
+
+    assert data.table == 'evaluations'
+    assert data.rowids.tolist() == list(range(1, 26))
+    assert set(data.numeric) == {'xlen', 'objective', 'note'}
+    assert np.isnan(data.numeric['objective'][1])
+    assert data.text['status'] == ['done'] * 25
+
+
+def test_read_results_db_incremental(tmp_path):
+    path = str(tmp_path / 'results.db')
+    create_db(path, 5)
+    create_db(path, 3)
+
+    data = read_results_db(path, after_rowid=np.int64(5), batch_size=2)
+    assert data.after_rowid == 5  # noqa: PLR2004
+    assert data.rowids.tolist() == [6, 7, 8]
+    assert data.numeric['xlen'].tolist() == [0.0, 1.0, 2.0]
+
+    # a rowid beyond the table reads all rows again
+    data = read_results_db(path, after_rowid=100)
+    assert data.after_rowid == 0
+    assert len(data.rowids) == 8  # noqa: PLR2004
@@ -0,0 +1,63 @@
+import io
+
+from cube.readers.uu import (
+    DIRECTION_OF_J,
+    EIGENVALUE_SUM,
+    TOTAL_MOMENT,
+    UNIT_CELL_VOLUME,
+    scan_first_values,
+    scan_last_values,
+    scan_last_values_reverse,
+)
+
+
+def test_scan_last_values():
+    with open('tests/data/uu/GS/x/out_last', 'rb') as file:
+        text = file.read()
+
+    for data in (text, text.decode()):
+        values = scan_last_values(data, [TOTAL_MOMENT, DIRECTION_OF_J,
+                                         UNIT_CELL_VOLUME])
+        assert values[TOTAL_MOMENT] == {
+            'Fe1': [2.2, 2.14, 0.06],
+            'Fe2': [2.2, 2.14, 0.06],
+            'Pt3': [0.35, 0.3, 0.05],
+        }
+        assert values[DIRECTION_OF_J]['Pt3'] == [1.0, 0.0, 0.0]
+        assert values[UNIT_CELL_VOLUME] == {'unit': [674.834]}
+
+
+def test_scan_last_values_reverse():
+    labels = [TOTAL_MOMENT, DIRECTION_OF_J, UNIT_CELL_VOLUME, EIGENVALUE_SUM]
+    for path in ('tests/data/uu/GS/x/out_last', 'tests/data/uu/GS/z/out_MF_z'):
+        with open(path, 'rb') as file:
+            expected = scan_last_values(file.read(), labels)
+        for block_size in (7, 64, 1 << 16):
+            with open(path, 'rb') as file:
+                assert scan_last_values_reverse(file, labels, block_size) == expected
+
+
+def test_scan_last_values_reverse_stops_early():
+    history = b''.join(
+        b' Eigenvalue sum:   %d.0\n' % i + b'x' * 100 + b'\n' for i in range(1000)
+    )
+    file = io.BytesIO(history)
+
+    values = scan_last_values_reverse(file, [EIGENVALUE_SUM], block_size=256)
+
+    assert values[EIGENVALUE_SUM] == {'Eigenvalue': [999.0]}
+    assert file.tell() > len(history) - 1024  # noqa: PLR2004
+
+
+def test_scan_first_values():
+    for block_size in (7, 64, 1 << 16):
+        with open('tests/data/uu/GS/x/out_last', 'rb') as file:
+            values = scan_first_values(file, [UNIT_CELL_VOLUME], block_size)
+        assert values[UNIT_CELL_VOLUME] == {'unit': [674.834]}
+
+    header = b' unit cell volume:   1.0\n' + b'x' * 100 + b'\n'
+    file = io.BytesIO(header * 1000)
+    values = scan_first_values(file, [UNIT_CELL_VOLUME, TOTAL_MOMENT], limit=1024)
+    assert values[UNIT_CELL_VOLUME] == {'unit': [1.0]}
+    assert values[TOTAL_MOMENT] == {}
+    assert file.tell() <= 1024  # noqa: PLR2004
@@ -0,0 +1,31 @@
+from cube.readers.yamlblocks import block_digest, load_yaml, split_blocks
+
+CONFIG = '''# sweep
+database:
+  name: sweep   # the name
+  db_path: results.db
+
+shape:
+  name: Box
+'''
+
+
+def test_split_blocks():
+    blocks = split_blocks(CONFIG)
+
+    assert list(blocks) == ['database', 'shape']
+    assert load_yaml(blocks['shape']) == {'shape': {'name': 'Box'}}
+    assert load_yaml(blocks['database'])['database']['db_path'] == 'results.db'
+
+
+def test_split_blocks_unsafe():
+    assert split_blocks('---\nshape:\n  name: Box\n') is None
+    assert split_blocks('a: &x 1\nb: *x\n') is None
+    assert split_blocks('a: 1\na: 2\n') is None
+
+
+def test_block_digest():
+    assert block_digest('shape:\n  name: Box\n') == block_digest(
+        'shape:\n  # comment\n  name: Box   \n\n')
+    assert block_digest('shape:\n  name: Box\n') != block_digest(
+        'shape:\n  name: Ellipse\n')
@@ -1,6 +1,15 @@
+import io
 import os.path
+import shutil
+import sqlite3
 
+import numpy as np
 from nomad.client import normalize_all, parse
+from nomad.datamodel import ClientContext, EntryArchive
+
+from cube.readers.resultcache import ResultCache
+from cube.schema_packages import tmrshape, uu_schema
+from cube.schema_packages.tmrshape import local_raw_file
 
 
 def test_schema_package():
@@ -10,3 +19,336 @@ def test_schema_package():
 
     # TODO: we should have some meaningful tests here ...
     assert len(entry_archive.data.steps) == 80 # noqa: PLR2004
+
+
+def test_cube_arrays():
+    test_file = os.path.join('tests', 'data', 'test_cube.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert data.H_ex.shape == data.M.shape == (80,)
+    assert data.steps[-1].H_ex == data.H_ex[-1]
+    assert data.steps[-1].M == data.M[-1]
+
+
+def test_b4vex_result():
+    test_file = os.path.join('tests', 'data', 'test_b4vex.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    assert entry_archive.data.M.shape == (80,)
+    assert len(entry_archive.data.figures) == 1
+
+
+def test_repeated_normalization():
+    test_file = os.path.join('tests', 'data', 'test_cube.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+    H_ex = entry_archive.data.H_ex
+    normalize_all(entry_archive)
+
+    assert entry_archive.data.H_ex is H_ex
+    assert len(entry_archive.data.figures) == 1
+    assert len(entry_archive.data.input_fingerprints) == 1
+    assert entry_archive.data.input_fingerprints[0].size == os.path.getsize(
+        os.path.join('tests', 'data', 'cube.dat')
+    )
+
+
+def test_cube_summary():
+    test_file = os.path.join('tests', 'data', 'test_cube.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    summary = entry_archive.data.summary
+    assert summary.n_branches == 1
+    assert -0.6 < summary.coercive_fields[0] < -0.58  # noqa: PLR2004
+
+
+def test_uu_anisotropy():
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    k1 = entry_archive.data.k1.MagnetocrystallineAnisotropyConstantK1
+    assert abs(k1.to('J/m**3').magnitude - 4.3597e6) < 1e2  # noqa: PLR2004
+
+    anisotropy = entry_archive.data.anisotropy
+    assert list(anisotropy.directions) == ['x', 'z']
+    assert list(anisotropy.terms) == ['K1']
+    assert abs(anisotropy.residuals.magnitude).max() < 1e-9  # noqa: PLR2004
+
+
+def test_uu_sites():
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert list(data.site_labels) == ['Fe1', 'Fe2', 'Pt3']
+    assert data.site_moments.shape == (3, 3)
+    assert data.site_directions[2].tolist() == [1.0, 0.0, 0.0]
+    # (2.2 + 2.2 + 0.35) mu_B / 100 A^3 * 11.654
+    assert abs(data.Ms.to('T').magnitude - 0.55356) < 1e-4  # noqa: PLR2004
+
+
+def test_uu_monte_carlo_input():
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    monte_carlo = entry_archive.data.monteCarlo
+    assert monte_carlo.positions.shape == (3, 3)
+    assert monte_carlo.exchange_J.shape == (12,)
+    assert monte_carlo.exchange_J[0].to('millirydberg').magnitude == 1.2  # noqa: PLR2004
+
+
+def test_uu_curie_temperature():
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert data.monteCarlo.lattice_summed_exchange.shape == (3, 3)
+    # 2/3 * 3.2553 mRy / k_B
+    assert abs(data.curie_temperature_mean_field.to('K').magnitude - 342.6) < 0.5  # noqa: PLR2004
+
+
+def test_uu_invalid_exchange_pairs(tmp_path):
+    shutil.copytree(os.path.join('tests', 'data', 'uu'), tmp_path / 'uu')
+    with open(tmp_path / 'uu' / 'MC' / 'jfile', 'a') as file:
+        file.write('1 5  1.0  0.0  0.0  0.40\n')
+    entry_archive = parse(str(tmp_path / 'uu' / 'structure.cif'))[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert len(data.monteCarlo.exchange_J) == 13  # noqa: PLR2004
+    assert data.monteCarlo.lattice_summed_exchange is None
+    assert data.curie_temperature_mean_field is None
+    assert data.Ms is not None
+
+
+def test_uu_crystal_structure():
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    structure = entry_archive.data.crystalStructure
+    assert structure.spaceGroup.spaceGroup == 'P 4/m m m'
+    assert abs(structure.latticeConstantC.length.to('angstrom').magnitude - 3.71) < 1e-9  # noqa: PLR2004
+    assert abs(structure.cellVolume.volume.to('nm**3').magnitude - 0.0552775) < 1e-6  # noqa: PLR2004
+
+
+def test_uu_invalid_crystal_structure(tmp_path):
+    shutil.copytree(os.path.join('tests', 'data', 'uu'), tmp_path / 'uu')
+    with open(tmp_path / 'uu' / 'structure.cif', 'w') as file:
+        file.write('data_x\n_cell_length_a 3.86\n_cell_length_b ?\n')
+    entry_archive = parse(str(tmp_path / 'uu' / 'structure.cif'))[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert data.crystalStructure.latticeConstantA is None
+    assert data.Ms is not None
+
+
+def test_uu_result_cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    monkeypatch.setattr(uu_schema, 'result_cache', lambda: cache)
+    test_file = os.path.join('tests', 'data', 'test_uu.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+    assert len(cache) == 1
+
+    def no_read(*args):
+        raise AssertionError('the output files are read again')
+
+    monkeypatch.setattr(uu_schema, 'read_out_last', no_read)
+    monkeypatch.setattr(uu_schema, 'read_eigenvalue_sum', no_read)
+    cached_archive = parse(test_file)[0]
+    normalize_all(cached_archive)
+
+    data, cached = entry_archive.data, cached_archive.data
+    assert cached.k1.MagnetocrystallineAnisotropyConstantK1 == \
+        data.k1.MagnetocrystallineAnisotropyConstantK1
+    assert cached.Ms == data.Ms
+    assert cached.unit_cell_volume == data.unit_cell_volume
+    assert (cached.site_moments == data.site_moments).all()
+
+
+
+def test_uu_result_cache_checks_content(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(uu_schema, 'result_cache', lambda: cache)
+    shutil.copytree(os.path.join('tests', 'data', 'uu'), tmp_path / 'uu')
+    mainfile = str(tmp_path / 'uu' / 'structure.cif')
+    normalize_all(parse(mainfile)[0])
+    assert len(cache) == 1
+
+    # same size and modification time, but different content
+    for out_last in (tmp_path / 'uu' / 'GS').glob('*/out_last'):
+        stat = os.stat(out_last)
+        out_last.write_bytes(out_last.read_bytes().replace(b'1', b'2', 1))
+        os.utime(out_last, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    reads = []
+    read_out_last = uu_schema.read_out_last
+    monkeypatch.setattr(
+        uu_schema, 'read_out_last', lambda *args: reads.append(args) or
+        read_out_last(*args))
+    normalize_all(parse(mainfile)[0])
+    assert len(reads) == 1
+
+def test_b4vex_campaign():
+    test_file = os.path.join('tests', 'data', 'test_b4vex_campaign.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    data = entry_archive.data
+    assert data.H_ex.shape == data.M.shape == (3, 80)
+    assert data.n_steps.tolist() == [80, 80, 60]
+    assert np.isnan(data.M[2, 60:]).all()
+    assert np.isnan(data.objective_values[2])
+    assert data.best_objective[2] == data.best_objective[1] > data.best_objective[0]
+    assert data.best_iteration == 1
+
+
+def test_b4vex_campaign_incremental(monkeypatch):
+    test_file = os.path.join('tests', 'data', 'test_b4vex_campaign.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    data = entry_archive.data
+    all_files = list(data.result_files)
+    data.result_files = all_files[:2]
+    normalize_all(entry_archive)
+    assert data.H_ex.shape == (2, 80)
+
+    read = []
+
+    def load_cube_dat(file, *args, **kwargs):
+        read.append(file)
+        return original(file, *args, **kwargs)
+
+    original = tmrshape.load_cube_dat
+    monkeypatch.setattr(tmrshape, 'load_cube_dat', load_cube_dat)
+    data.result_files = all_files
+    normalize_all(entry_archive)
+
+    assert len(read) == 1
+    assert data.H_ex.shape == (3, 80)
+    assert data.best_objective.tolist() == [
+        data.objective_values[0], data.objective_values[1], data.objective_values[1]]
+
+
+def test_b4vex_campaign_objective_change():
+    test_file = os.path.join('tests', 'data', 'test_b4vex_campaign.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+    data = entry_archive.data
+    coercive_fields = data.objective_values.copy()
+
+    data.objective = 'saturation_magnetisation'
+    normalize_all(entry_archive)
+    assert data.evaluated_objective == 'saturation_magnetisation'
+    assert not np.array_equal(data.objective_values, coercive_fields,
+                              equal_nan=True)
+    assert data.objective_values[0] == np.nanmax(np.abs(data.M[0]))
+
+    data.maximize = False
+    normalize_all(entry_archive)
+    assert data.best_objective[-1] == np.nanmin(data.objective_values)
+
+
+def test_b4vex_config_block_cache(monkeypatch):
+    monkeypatch.setattr(tmrshape, '_config_blocks', tmrshape.OrderedDict())
+    parsed = []
+
+    def load_yaml(text):
+        parsed.append(text)
+        return original(text)
+
+    original = tmrshape.load_yaml
+    monkeypatch.setattr(tmrshape, 'load_yaml', load_yaml)
+    with open(os.path.join('tests', 'data', 'b4vex', 'config.yaml')) as file:
+        text = file.read()
+
+    config = tmrshape.config_from_text(text)
+    other = tmrshape.config_from_text(text.replace('init_xlen: 20.0',
+                                                   'init_xlen: 30.0'))
+
+    assert len(parsed) == 7  # noqa: PLR2004
+    assert other.shape.init_xlen.to('nm').magnitude == 30.0  # noqa: PLR2004
+    assert config.shape.init_xlen.to('nm').magnitude == 20.0  # noqa: PLR2004
+    assert other.optimizer is not config.optimizer
+    assert other.optimizer.kappa == config.optimizer.kappa
+    assert other.simulation.hstep == 0.02  # noqa: PLR2004
+
+
+def test_b4vex_config_invalid_values(monkeypatch):
+    monkeypatch.setattr(tmrshape, '_config_blocks', tmrshape.OrderedDict())
+    warnings = []
+
+    class Logger:
+        def warning(self, message):
+            warnings.append(message)
+
+    with open(os.path.join('tests', 'data', 'b4vex', 'config.yaml')) as file:
+        text = file.read().replace('mem_GB: 32', 'mem_GB: 32G')
+
+    for _ in range(2):
+        config = tmrshape.config_from_text(text, Logger())
+        assert config.server.mem_GB is None
+        assert config.simulation.iter == 3  # noqa: PLR2004
+    assert len(warnings) == 2  # noqa: PLR2004
+    assert "'32G' of mem_GB" in warnings[0]
+
+
+def test_b4vex_results_database(tmp_path):
+    shutil.copy(os.path.join('tests', 'data', 'b4vex_run', 'config.yaml'), tmp_path)
+    shutil.copy(os.path.join('tests', 'data', 'b4vex_run', 'result.dat'), tmp_path)
+
+    def add_rows(rows):
+        connection = sqlite3.connect(tmp_path / 'results.db')
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS tmr_run '
+                               '(r1 REAL, objective REAL, status TEXT)')
+            connection.executemany('INSERT INTO tmr_run VALUES (?, ?, ?)', rows)
+        connection.close()
+
+    add_rows([(10.0, 0.5, 'done'), (12.0, 0.7, 'done')])
+    entry_archive = parse(str(tmp_path / 'config.yaml'))[0]
+    normalize_all(entry_archive)
+
+    evaluations = entry_archive.data.evaluations
+    assert evaluations.table == 'tmr_run'
+    assert evaluations.n_rows == 2  # noqa: PLR2004
+    columns = {column.name: column for column in evaluations.columns}
+    assert columns['objective'].values.tolist() == [0.5, 0.7]
+    assert list(columns['status'].text_values) == ['done', 'done']
+
+    add_rows([(14.0, 0.9, 'failed')])
+    normalize_all(entry_archive)
+
+    evaluations = entry_archive.data.evaluations
+    assert evaluations.n_rows == evaluations.last_rowid == 3  # noqa: PLR2004
+    columns = {column.name: column for column in evaluations.columns}
+    assert columns['r1'].values.tolist() == [10.0, 12.0, 14.0]
+    assert list(columns['status'].text_values) == ['done', 'done', 'failed']
+
+
+def test_local_raw_file(tmp_path):
+    (tmp_path / 'results.db').write_bytes(b'content')
+    archive = EntryArchive(m_context=ClientContext(local_dir=str(tmp_path)))
+    with local_raw_file(archive, 'results.db') as path:
+        assert path == os.path.join(str(tmp_path), 'results.db')
+
+    class ZippedContext(ClientContext):
+        # like published uploads, the raw files have no OS path
+        def raw_file(self, path, *args, **kwargs):
+            return io.BytesIO((tmp_path / path).read_bytes())
+
+    archive = EntryArchive(m_context=ZippedContext(local_dir=None))
+    with local_raw_file(archive, 'results.db') as path:
+        assert path != os.path.join(str(tmp_path), 'results.db')
+        with open(path, 'rb') as file:
+            assert file.read() == b'content'
+    assert not os.path.exists(path)
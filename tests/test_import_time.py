@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+# modules that NOMAD loads in every process anyway, imported before the plugin
+BASELINE = (
+    'numpy',
+    'nomad.datamodel',
+    'nomad.datamodel.metainfo.plot',
+    'nomad.datamodel.results',
+    'nomad.metainfo',
+    'nomad.parsing',
+    'nomad.units',
+)
+PLUGIN = (
+    'cube.schema_packages',
+    'cube.schema_packages.cube',
+    'cube.schema_packages.tmrshape',
+    'cube.schema_packages.mammos_ontology',
+    'cube.schema_packages.uu_schema',
+    'cube.parsers',
+    'cube.parsers.cubeparser',
+    'cube.parsers.uuparser',
+    'cube.parsers.b4vexparser',
+)
+# dependencies that are only imported by the normalizers that need them
+DEFERRED = ('plotly.express', 'scipy.sparse', 'yaml')
+# generous, the schema definitions themselves take a few hundred ms
+IMPORT_BUDGET_US = 2_000_000
+
+
+def plugin_import_times() -> dict[str, int]:
+    '''
+    Returns the cumulative import time in us of every module that is imported by
+    the plugin on top of the baseline, from the output of `python -X importtime`.
+    '''
+    code = f'import {", ".join(BASELINE)}; import {", ".join(PLUGIN)}'
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True,
+    ).stderr
+
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # the name is indented by two spaces per nesting level
+        times.append((name[1:].rstrip(), int(cumulative)))
+    # modules are reported when they finish, so everything after the last
+    # top-level baseline module is imported by the plugin
+    start = max(i for i, (name, _) in enumerate(times) if name.strip() in BASELINE
+                and not name.startswith(' '))
+    return {name: cumulative for name, cumulative in times[start + 1:]}
+
+
+def test_plugin_import_time():
+    times = plugin_import_times()
+    modules = {name.strip() for name in times}
+
+    assert not modules & set(DEFERRED)
+    total = sum(cumulative for name, cumulative in times.items()
+                if not name.startswith(' '))
+    assert total < IMPORT_BUDGET_US, f'plugin imports took {total} us'